@@ -0,0 +1,979 @@
+"""
+PyGenius AI Analyzer - single-pass AST bug detection with pluggable rules
+"""
+import os
+import ast
+import gc
+import sys
+import time
+
+# Calls that read the namespace dynamically; unused-variable checks are
+# skipped in scopes that use them
+_DYNAMIC_NAME_CALLS = frozenset(("locals", "vars", "eval", "exec"))
+
+# Node fields that never hold child nodes, and fields holding operator or
+# context singletons, which are only walked when a rule asks for them
+_SCALAR_FIELDS = frozenset(("id", "arg", "attr", "name", "module", "level", "kind",
+                            "conversion", "type_comment", "is_async", "asname"))
+_OPERATOR_FIELDS = frozenset(("ctx", "op", "ops"))
+_OPERATOR_TYPES = (ast.expr_context, ast.operator, ast.unaryop, ast.boolop, ast.cmpop)
+# (node class, walk operators) -> names of fields that may hold child nodes
+_child_fields = {}
+
+_MUTABLE_LITERALS = (ast.List, ast.Dict, ast.Set)
+_MUTABLE_FACTORIES = frozenset(("list", "dict", "set", "defaultdict", "OrderedDict"))
+
+
+def make_issue(line, issue_type, message, severity):
+    """Issue dict in the format returned by analyze_code_for_bugs"""
+    return {
+        'line': line,
+        'type': issue_type,
+        'message': message,
+        'severity': severity,
+    }
+
+
+class Scope:
+    """Names bound, assigned and loaded in one module/function/class scope"""
+
+    __slots__ = ("kind", "parent", "children", "bound", "assigned", "uses",
+                 "declared", "dynamic", "free")
+
+    def __init__(self, kind, parent=None):
+        self.kind = kind
+        self.parent = parent
+        self.children = []
+        self.bound = set()
+        self.assigned = {}
+        self.uses = set()
+        self.declared = set()
+        self.dynamic = False
+        self.free = set()
+        if parent is not None:
+            parent.children.append(self)
+
+
+def _is_zero(node):
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        node = node.operand
+    return (isinstance(node, ast.Constant) and type(node.value) in (int, float)
+            and node.value == 0)
+
+
+def _is_mutable_default(node):
+    if isinstance(node, _MUTABLE_LITERALS):
+        return True
+    return (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+            and node.func.id in _MUTABLE_FACTORIES)
+
+
+class Rule:
+    """
+    Base class for analyzer rules
+
+    A rule declares the AST node types it cares about; the engine walks the
+    tree once and calls check(node, analyzer) only for those node types.
+    finish(analyzer) runs after the walk, once scopes are resolved. Issues
+    are reported with analyzer.report(...).
+    """
+
+    name = None
+    node_types = ()
+
+    def __init__(self):
+        self.calls = 0
+        self.time_ns = 0
+
+    def check(self, node, analyzer):
+        pass
+
+    def finish(self, analyzer):
+        pass
+
+
+_rules = {}
+_disabled_rules = set()
+_registry_version = 0
+
+
+def register_rule(rule_class):
+    """Class decorator adding a Rule subclass to the registry"""
+    global _registry_version
+    rule = rule_class()
+    _rules[rule.name] = rule
+    _registry_version += 1
+    return rule_class
+
+
+def set_rule_enabled(name, enabled=True):
+    """Enable or disable a registered rule; returns False for unknown names"""
+    global _registry_version
+    if name not in _rules:
+        return False
+    if enabled:
+        _disabled_rules.discard(name)
+    else:
+        _disabled_rules.add(name)
+    _registry_version += 1
+    return True
+
+
+def enabled_rules():
+    return [rule for name, rule in _rules.items() if name not in _disabled_rules]
+
+
+def list_rules():
+    """Registered rules with their node types and enabled state"""
+    return [
+        {
+            'name': name,
+            'node_types': [t.__name__ for t in rule.node_types],
+            'enabled': name not in _disabled_rules,
+        }
+        for name, rule in _rules.items()
+    ]
+
+
+def get_rule_timings():
+    """Cumulative calls and time per rule, most expensive first"""
+    timings = [
+        {
+            'name': name,
+            'calls': rule.calls,
+            'total_ms': rule.time_ns / 1e6,
+            'avg_us': rule.time_ns / rule.calls / 1e3 if rule.calls else 0.0,
+            'enabled': name not in _disabled_rules,
+        }
+        for name, rule in _rules.items()
+    ]
+    timings.sort(key=lambda item: item['total_ms'], reverse=True)
+    return timings
+
+
+def reset_rule_timings():
+    for rule in _rules.values():
+        rule.calls = 0
+        rule.time_ns = 0
+
+
+class Analyzer:
+    """
+    Walks a module AST once, tracking scopes and emitting issues
+
+    Definitions and uses are collected per scope during the walk, and each
+    node is handed to the rules registered for its type. Free names are then
+    propagated from nested scopes to their parents before rules finish.
+    """
+
+    def __init__(self, rules=None):
+        self.issues = []
+        self.module_scope = Scope("module")
+        self.scope = self.module_scope
+        # Module-level unused variables may depend on code outside the tree
+        self.report_module_unused = True
+        self.rules = enabled_rules() if rules is None else rules
+        self._rules_for = {}
+        for rule in self.rules:
+            for node_type in rule.node_types:
+                self._rules_for.setdefault(node_type, []).append(rule)
+        self._walk_operators = any(issubclass(node_type, _OPERATOR_TYPES)
+                                   for node_type in self._rules_for)
+        # node class -> (rules, handler), filled on first sight of each class
+        self._visitors = {}
+        self._dispatch = {
+            ast.Name: self._visit_name,
+            ast.Assign: self._visit_assign,
+            ast.AnnAssign: self._visit_annassign,
+            ast.AugAssign: self._visit_augassign,
+            ast.FunctionDef: self._visit_function,
+            ast.AsyncFunctionDef: self._visit_function,
+            ast.Lambda: self._visit_lambda,
+            ast.ClassDef: self._visit_class,
+            ast.ListComp: self._visit_comprehension,
+            ast.SetComp: self._visit_comprehension,
+            ast.DictComp: self._visit_comprehension,
+            ast.GeneratorExp: self._visit_comprehension,
+            ast.Global: self._visit_declaration,
+            ast.Nonlocal: self._visit_declaration,
+            ast.Import: self._visit_import,
+            ast.ImportFrom: self._visit_import,
+            ast.Call: self._visit_call,
+            ast.Constant: self._visit_leaf,
+        }
+
+    # -- traversal ---------------------------------------------------------
+
+    def visit(self, node):
+        try:
+            rules, handler = self._visitors[node.__class__]
+        except KeyError:
+            rules, handler = self._visitor_for(node.__class__)
+        if rules:
+            self._run_rules(rules, node)
+        handler(node)
+
+    def _visitor_for(self, node_class):
+        visitor = (self._rules_for.get(node_class),
+                   self._dispatch.get(node_class, self.visit_children))
+        self._visitors[node_class] = visitor
+        return visitor
+
+    def visit_children(self, node):
+        key = (node.__class__, self._walk_operators)
+        fields = _child_fields.get(key)
+        if fields is None:
+            skip = _SCALAR_FIELDS if self._walk_operators else _SCALAR_FIELDS | _OPERATOR_FIELDS
+            fields = _child_fields[key] = tuple(f for f in node._fields if f not in skip)
+        for field in fields:
+            value = getattr(node, field, None)
+            if value.__class__ is list:
+                for item in value:
+                    if isinstance(item, ast.AST):
+                        self.visit(item)
+            elif isinstance(value, ast.AST):
+                self.visit(value)
+
+    def _visit_leaf(self, node):
+        pass
+
+    def _run_rules(self, rules, node):
+        clock = time.perf_counter_ns
+        for rule in rules:
+            started = clock()
+            rule.check(node, self)
+            rule.calls += 1
+            rule.time_ns += clock() - started
+
+    def report(self, line, issue_type, message, severity):
+        self.issues.append(make_issue(line, issue_type, message, severity))
+
+    def visit_all(self, nodes):
+        for node in nodes:
+            if node is not None:
+                self.visit(node)
+
+    def _push(self, kind):
+        self.scope = Scope(kind, self.scope)
+        return self.scope
+
+    def _pop(self):
+        self.scope = self.scope.parent
+
+    # -- names and bindings ------------------------------------------------
+
+    def _visit_name(self, node):
+        if isinstance(node.ctx, ast.Store):
+            self.scope.bound.add(node.id)
+        else:
+            # Load and Del both count as a use
+            self.scope.uses.add(node.id)
+
+    def _record_assigned(self, target, line):
+        if isinstance(target, ast.Name):
+            self.scope.assigned.setdefault(target.id, line)
+        elif isinstance(target, (ast.Tuple, ast.List)):
+            for element in target.elts:
+                self._record_assigned(element, line)
+        elif isinstance(target, ast.Starred):
+            self._record_assigned(target.value, line)
+
+    def _visit_assign(self, node):
+        self.visit(node.value)
+        for target in node.targets:
+            self._record_assigned(target, node.lineno)
+            self.visit(target)
+
+    def _visit_annassign(self, node):
+        self.visit(node.annotation)
+        if node.value is not None:
+            self.visit(node.value)
+            self._record_assigned(node.target, node.lineno)
+        self.visit(node.target)
+
+    def _visit_augassign(self, node):
+        # x += 1 reads x as well as writing it
+        if isinstance(node.target, ast.Name):
+            self.scope.uses.add(node.target.id)
+        self.visit(node.value)
+        self.visit(node.target)
+
+    def _visit_declaration(self, node):
+        self.scope.declared.update(node.names)
+
+    def _visit_import(self, node):
+        for alias in node.names:
+            name = alias.asname or alias.name.partition('.')[0]
+            if name != '*':
+                self.scope.bound.add(name)
+
+    def _visit_call(self, node):
+        if isinstance(node.func, ast.Name) and node.func.id in _DYNAMIC_NAME_CALLS:
+            self.scope.dynamic = True
+        self.visit_children(node)
+
+    # -- scopes ------------------------------------------------------------
+
+    def _visit_arguments(self, args):
+        all_args = args.posonlyargs + args.args + args.kwonlyargs
+        if args.vararg:
+            all_args.append(args.vararg)
+        if args.kwarg:
+            all_args.append(args.kwarg)
+        for arg in all_args:
+            self.scope.bound.add(arg.arg)
+
+    def _visit_function(self, node):
+        # Decorators, defaults and annotations run in the enclosing scope
+        self.visit_all(node.decorator_list)
+        args = node.args
+        self.visit_all(args.defaults)
+        self.visit_all([d for d in args.kw_defaults if d is not None])
+        for arg in args.posonlyargs + args.args + args.kwonlyargs + [args.vararg, args.kwarg]:
+            if arg is not None and arg.annotation is not None:
+                self.visit(arg.annotation)
+        if node.returns is not None:
+            self.visit(node.returns)
+        self.scope.bound.add(node.name)
+
+        self._push("function")
+        self._visit_arguments(args)
+        self.visit_all(node.body)
+        self._pop()
+
+    def _visit_lambda(self, node):
+        args = node.args
+        self.visit_all(args.defaults)
+        self.visit_all([d for d in args.kw_defaults if d is not None])
+        self._push("function")
+        self._visit_arguments(args)
+        self.visit(node.body)
+        self._pop()
+
+    def _visit_class(self, node):
+        self.visit_all(node.decorator_list)
+        self.visit_all(node.bases)
+        self.visit_all(node.keywords)
+        self.scope.bound.add(node.name)
+        self._push("class")
+        self.visit_all(node.body)
+        self._pop()
+
+    def _visit_comprehension(self, node):
+        generators = node.generators
+        # The first iterable is evaluated in the enclosing scope
+        self.visit(generators[0].iter)
+        self._push("comprehension")
+        for index, comp in enumerate(generators):
+            if index:
+                self.visit(comp.iter)
+            self.visit(comp.target)
+            self.visit_all(comp.ifs)
+        if isinstance(node, ast.DictComp):
+            self.visit(node.key)
+            self.visit(node.value)
+        else:
+            self.visit(node.elt)
+        self._pop()
+
+    # -- resolution --------------------------------------------------------
+
+    def _resolve_free(self, scope):
+        """Post-order: names used in a scope or its children but bound elsewhere"""
+        child_free = set()
+        for child in scope.children:
+            child_free |= self._resolve_free(child)
+        scope.free = child_free
+        local = scope.bound if scope.kind != "class" else set()
+        return ((scope.uses | child_free) - local) | scope.declared
+
+    def _finish_rules(self):
+        clock = time.perf_counter_ns
+        for rule in self.rules:
+            started = clock()
+            rule.finish(self)
+            rule.time_ns += clock() - started
+
+    def collect(self, tree, report_module_unused=False):
+        """
+        Walk tree and run every rule; module-level unused variables are
+        only reported when report_module_unused is set
+        """
+        self.report_module_unused = report_module_unused
+        try:
+            self.visit_all(tree.body)
+        except RecursionError:
+            self._collect_flat(tree)
+        self._resolve_free(self.module_scope)
+        self._finish_rules()
+        return self.issues
+
+    def _collect_flat(self, tree):
+        """
+        Fallback for trees too deep to walk recursively (x = 1+1+... with
+        hundreds of terms): per-node rules run over an iterative walk, but
+        scopes are not tracked, so nothing here is reported as unused
+        """
+        self.issues = []
+        self.module_scope = self.scope = Scope("module")
+        uses = self.module_scope.uses
+        for node in ast.walk(tree):
+            rules = self._rules_for.get(node.__class__)
+            if rules:
+                self._run_rules(rules, node)
+            if node.__class__ is ast.Name:
+                uses.add(node.id)
+        line = tree.body[0].lineno if tree.body else 1
+        self.report(line, 'info', 'Code is nested too deeply for full analysis - '
+                    'scope checks were skipped', 'low')
+
+    def module_summary(self):
+        """Module-scope assignments and uses, for cross-block resolution"""
+        scope = self.module_scope
+        return scope.assigned, scope.uses | scope.free | scope.declared, scope.dynamic
+
+    def run(self, tree):
+        self.collect(tree, report_module_unused=True)
+        self.issues.sort(key=lambda issue: issue['line'])
+        return self.issues
+
+
+def unused_issue(name, line):
+    return make_issue(line, 'info', f"Variable '{name}' may be unused (dead code)", 'low')
+
+
+# -- built-in rules ------------------------------------------------------------
+
+_DIVISION_OPS = (ast.Div, ast.FloorDiv, ast.Mod)
+
+
+@register_rule
+class ZeroDivisionRule(Rule):
+    """Division or modulo by a literal zero"""
+
+    name = "zero-division"
+    node_types = (ast.BinOp, ast.AugAssign)
+
+    def check(self, node, analyzer):
+        divisor = node.right if isinstance(node, ast.BinOp) else node.value
+        if isinstance(node.op, _DIVISION_OPS) and _is_zero(divisor):
+            analyzer.report(node.lineno, 'warning',
+                            'Possible ZeroDivisionError - ensure divisor is not zero',
+                            'high')
+
+
+@register_rule
+class MutableDefaultRule(Rule):
+    """Function defaults that are shared mutable objects"""
+
+    name = "mutable-default"
+    node_types = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+    def check(self, node, analyzer):
+        args = node.args
+        defaults = args.defaults + [d for d in args.kw_defaults if d is not None]
+        if any(_is_mutable_default(d) for d in defaults):
+            analyzer.report(node.lineno, 'warning',
+                            'Mutable default argument detected - use None and initialize inside function',
+                            'medium')
+
+
+@register_rule
+class BareExceptRule(Rule):
+    """except: without an exception type"""
+
+    name = "bare-except"
+    node_types = (ast.ExceptHandler,)
+
+    def check(self, node, analyzer):
+        if node.type is None:
+            analyzer.report(node.lineno, 'warning',
+                            'Bare except clause - catch specific exceptions instead',
+                            'medium')
+
+
+@register_rule
+class UnusedVariableRule(Rule):
+    """Assigned names never read in their scope or any nested scope"""
+
+    name = "unused-variable"
+
+    def finish(self, analyzer):
+        self.calls += 1
+        if analyzer.report_module_unused:
+            self._report(analyzer, analyzer.module_scope)
+        self._report_nested(analyzer, analyzer.module_scope)
+
+    def _report(self, analyzer, scope):
+        if scope.dynamic or scope.kind == "class":
+            return
+        used = scope.uses | scope.free | scope.declared
+        for name, line in scope.assigned.items():
+            if name not in used and not name.startswith('_'):
+                analyzer.issues.append(unused_issue(name, line))
+
+    def _report_nested(self, analyzer, scope):
+        for child in scope.children:
+            self._report(analyzer, child)
+            self._report_nested(analyzer, child)
+
+
+def _without_gc(func, *args):
+    """
+    Call func with the cyclic GC paused: building and walking an AST
+    allocates tens of thousands of acyclic nodes, and every collection
+    triggered meanwhile rescans all of them
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return func(*args)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _parse_error(error, offset=0):
+    """Issue list for source that ast.parse rejects"""
+    if isinstance(error, SyntaxError):
+        return [make_issue(offset + (error.lineno or 1), 'error', f"SyntaxError: {error.msg}", 'high')]
+    if isinstance(error, RecursionError):
+        return [make_issue(offset + 1, 'error',
+                           'RecursionError: expression nested too deeply to parse', 'high')]
+    # e.g. ValueError for source containing null bytes
+    return [make_issue(offset + 1, 'error', f"{type(error).__name__}: {error}", 'high')]
+
+
+def _analyze(code):
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError, RecursionError) as e:
+        return _parse_error(e)
+    return Analyzer().run(tree)
+
+
+def analyze(code):
+    """
+    Analyze source code and return a list of issue dicts
+    (line/type/message/severity); syntax errors are reported as one issue
+    """
+    return _without_gc(_analyze, code)
+
+
+# Lines at column 0 that continue the previous compound statement
+_CONTINUATION_PREFIXES = ("else", "elif", "except", "finally", ")", "]", "}")
+
+
+def _starts_block(line, previous):
+    """True if line (at column 0) begins a new top-level statement"""
+    if not line or line[0] in " \t#":
+        return False
+    if line.startswith(_CONTINUATION_PREFIXES):
+        word = line.split(None, 1)[0].rstrip(":")
+        if word in ("else", "elif", "except", "finally") or line[0] in ")]}":
+            return False
+    if previous is not None and (previous.startswith("@") or previous.endswith("\\")):
+        return False
+    return True
+
+
+def split_blocks(lines):
+    """
+    Split source lines into candidate top-level blocks as (start, end) index
+    pairs; a candidate cut short by a triple-quoted string or bracket that
+    continues past it is merged with the following ones by AnalysisSession
+    """
+    blocks = []
+    start = 0
+    previous = None
+    for index, line in enumerate(lines):
+        if index and _starts_block(line, previous):
+            blocks.append((start, index))
+            start = index
+        stripped = line.rstrip()
+        if stripped and not stripped.startswith("#") and not line[0].isspace():
+            previous = stripped
+    if lines:
+        blocks.append((start, len(lines)))
+    return blocks
+
+
+class _BlockResult:
+    """Cached analysis of one top-level block, with block-relative lines"""
+
+    __slots__ = ("issues", "assigned", "used", "dynamic")
+
+    def __init__(self, issues, assigned, used, dynamic):
+        self.issues = issues
+        self.assigned = assigned
+        self.used = used
+        self.dynamic = dynamic
+
+
+# Lines scanned past a candidate for the end of a string or bracket it opens
+MAX_MERGE_LINES = 1000
+
+
+def _continuation_end(lines, start, end, limit=MAX_MERGE_LINES):
+    """
+    End index of the logical line that starts in lines[start:end] and runs
+    past end (a multi-line string or open bracket containing column-0
+    lines), or None if no construct crosses end or it does not close
+    within limit lines
+    """
+    import tokenize
+    readline = (line + "\n" for line in lines[start:min(len(lines), end + limit)]).__next__
+    depth = 0
+    crossed = False
+    try:
+        for token in tokenize.generate_tokens(readline):
+            first = start + token.start[0] - 1
+            last = start + token.end[0] - 1
+            if token.type == tokenize.OP:
+                if token.string in "([{":
+                    depth += 1
+                elif token.string in ")]}":
+                    depth -= 1
+            if crossed:
+                if token.type == tokenize.NEWLINE:
+                    return last + 1
+            elif first >= end:
+                if depth <= 0:
+                    return None
+                crossed = True
+            elif last >= end:
+                # A string token spanning the boundary
+                crossed = True
+    except (tokenize.TokenError, SyntaxError):
+        # Unterminated within the limit: a plain syntax error
+        pass
+    return None
+
+
+def _analyze_block(text):
+    """Analyze one block; None if it does not parse on its own"""
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError, RecursionError):
+        return None
+    analyzer = Analyzer()
+    issues = analyzer.collect(tree)
+    assigned, used, dynamic = analyzer.module_summary()
+    return _BlockResult(issues, assigned, used, dynamic)
+
+
+class AnalysisSession:
+    """
+    Incremental bug analysis for an editor buffer
+
+    The buffer is split into top-level blocks. Each block's analysis is cached
+    by its source text, so after an edit only blocks whose text changed are
+    re-parsed. Module-level unused-variable detection depends on every block,
+    so it is re-resolved from the cached per-block summaries on each update.
+    """
+
+    def __init__(self):
+        self.lines = []
+        self._cache = {}
+        self._rules_version = _registry_version
+        self.issues = []
+        self.stats = {"blocks": 0, "reused": 0, "recomputed": 0, "time_ms": 0.0}
+
+    def update(self, code):
+        """Replace the whole buffer and return the current issues"""
+        self.lines = code.split("\n")
+        return _without_gc(self._analyze)
+
+    def apply_edit(self, start_line, end_line, text):
+        """
+        Replace lines start_line..end_line (1-based, inclusive) with text
+        and return the current issues; end_line = start_line - 1 inserts
+        """
+        self.lines[start_line - 1:end_line] = text.split("\n")
+        return _without_gc(self._analyze)
+
+    def _analyze(self):
+        started = time.perf_counter()
+        if self._rules_version != _registry_version:
+            # Rules were enabled/disabled: cached block results are stale
+            self._cache = {}
+            self._rules_version = _registry_version
+        lines = self.lines
+        cache = self._cache
+        live = {}
+        reused = recomputed = 0
+
+        def block_result(text):
+            nonlocal reused, recomputed
+            if text in cache:
+                reused += 1
+                return cache[text]
+            recomputed += 1
+            return _analyze_block(text)
+
+        results = []
+        candidates = split_blocks(lines)
+        index = 0
+        while index < len(candidates):
+            start, end = candidates[index]
+            text = "\n".join(lines[start:end])
+            result = block_result(text)
+            if result is None:
+                # Only merge across a string or bracket that really continues
+                # into the following candidates; anything else is reported as
+                # a syntax error and the next blocks are analyzed on their own
+                stop = _continuation_end(lines, start, end)
+                if stop is not None:
+                    while index + 1 < len(candidates) and candidates[index][1] < stop:
+                        index += 1
+                    end = candidates[index][1]
+                    text = "\n".join(lines[start:end])
+                    result = block_result(text)
+            live[text] = result
+            results.append((start, end, result))
+            index += 1
+
+        # Drop cache entries for text no longer in the buffer
+        self._cache = live
+
+        issues = []
+        assigned = {}
+        used = set()
+        dynamic = False
+        for start, end, result in results:
+            if result is None:
+                issues.extend(self._syntax_issue(start, end))
+                continue
+            for issue in result.issues:
+                shifted = dict(issue)
+                shifted['line'] += start
+                issues.append(shifted)
+            for name, line in result.assigned.items():
+                assigned.setdefault(name, line + start)
+            used |= result.used
+            dynamic = dynamic or result.dynamic
+
+        if not dynamic and "unused-variable" not in _disabled_rules:
+            for name, line in assigned.items():
+                if name not in used and not name.startswith('_'):
+                    issues.append(unused_issue(name, line))
+        issues.sort(key=lambda issue: issue['line'])
+
+        self.issues = issues
+        self.stats = {
+            "blocks": len(results),
+            "reused": reused,
+            "recomputed": recomputed,
+            "time_ms": (time.perf_counter() - started) * 1000,
+        }
+        return issues
+
+    def _syntax_issue(self, start, end):
+        try:
+            ast.parse("\n".join(self.lines[start:end]))
+        except (SyntaxError, ValueError, RecursionError) as e:
+            return _parse_error(e, start)
+        return []
+
+
+# Directories never descended into by analyze_project
+_SKIP_DIRS = frozenset(("__pycache__", "node_modules", "venv", ".venv", "build", "dist"))
+CACHE_FORMAT = 1
+# Bump whenever a rule's findings change, so persisted results are redone
+ANALYZER_VERSION = 1
+
+
+def _analyze_source(path, source, disabled=frozenset()):
+    """Process-pool worker: analyze one file's bytes and time it"""
+    global _registry_version
+    # Spawned workers start with the default rule set; match the parent's
+    if _disabled_rules != disabled:
+        _disabled_rules.clear()
+        _disabled_rules.update(disabled)
+        _registry_version += 1
+    started = time.perf_counter()
+    issues = analyze(source)
+    return path, issues, (time.perf_counter() - started) * 1000
+
+
+def iter_python_files(root):
+    """Yield .py files under root, skipping hidden and build directories"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames
+                             if not d.startswith(".") and d not in _SKIP_DIRS)
+        for filename in sorted(filenames):
+            if filename.endswith(".py"):
+                yield os.path.join(dirpath, filename)
+
+
+def default_cache_path(root):
+    import hashlib
+    from pygenius_runtime import _cache_dir
+    digest = hashlib.sha1(os.path.abspath(root).encode()).hexdigest()[:12]
+    return os.path.join(_cache_dir(), f"analysis-{digest}.json")
+
+
+def _cache_header():
+    """What cached issues depend on besides the file itself"""
+    return {"format": CACHE_FORMAT, "analyzer": ANALYZER_VERSION,
+            "rules": sorted(name for name in _rules if name not in _disabled_rules)}
+
+
+def _load_cache(cache_path):
+    import json
+    try:
+        with open(cache_path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    header = _cache_header()
+    if any(data.get(key) != value for key, value in header.items()):
+        return {}
+    return data.get("files", {})
+
+
+def _save_cache(cache_path, files):
+    import json
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(dict(_cache_header(), files=files), f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+def analyze_project(root, output=None, jobs=None, cache_path=None, use_cache=True,
+                    slowest=10):
+    """
+    Analyze every .py file under root across a process pool
+
+    Per-file results are streamed to output as JSON lines
+    ({"path", "issues", "time_ms", "cached"}) as soon as they complete,
+    followed by one {"summary": ...} line. A file whose analysis raised gets
+    a {"path", "error"} line instead and is retried on the next run. Files
+    whose mtime and size (or, failing that, content hash) match the
+    persisted cache are not re-analyzed; the cache is dropped when the set
+    of enabled rules or ANALYZER_VERSION changes.
+
+    Returns:
+        The summary dict: file counts, issue counts by severity and the
+        slowest files
+    """
+    # Imported here: the editor's real-time analysis never needs them
+    import json
+    import hashlib
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+    output = output or sys.stdout
+    started = time.perf_counter()
+    if use_cache and cache_path is None:
+        cache_path = default_cache_path(root)
+    cache = _load_cache(cache_path) if use_cache else {}
+    new_cache = {}
+    disabled = frozenset(_disabled_rules)
+
+    by_severity = {}
+    timings = []
+    counts = {"files": 0, "analyzed": 0, "cached": 0, "unreadable": 0, "failed": 0}
+
+    def emit(path, issues, time_ms, cached):
+        counts["files"] += 1
+        counts["cached" if cached else "analyzed"] += 1
+        for issue in issues:
+            by_severity[issue["severity"]] = by_severity.get(issue["severity"], 0) + 1
+        if not cached:
+            timings.append((time_ms, path))
+        output.write(json.dumps({"path": path, "issues": issues,
+                                 "time_ms": round(time_ms, 3), "cached": cached}) + "\n")
+        output.flush()
+
+    def collect(future):
+        path = pending.pop(future)
+        try:
+            _, issues, time_ms = future.result()
+        except Exception as e:
+            counts["files"] += 1
+            counts["failed"] += 1
+            del new_cache[path]
+            output.write(json.dumps({"path": path,
+                                     "error": f"{type(e).__name__}: {e}"}) + "\n")
+            output.flush()
+            return
+        new_cache[path]["issues"] = issues
+        emit(path, issues, time_ms, False)
+
+    # Bound the files in flight, so sources don't pile up in memory and
+    # results stream while the tree is still being walked
+    max_pending = 2 * (jobs or os.cpu_count() or 1)
+    pending = {}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for path in iter_python_files(root):
+            try:
+                st = os.stat(path)
+                entry = cache.get(path)
+                if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+                    new_cache[path] = entry
+                    emit(path, entry["issues"], 0.0, True)
+                    continue
+                with open(path, "rb") as f:
+                    source = f.read()
+            except OSError:
+                counts["unreadable"] += 1
+                continue
+            digest = hashlib.sha256(source).hexdigest()
+            if entry and entry["sha256"] == digest:
+                # Touched but unchanged: refresh the stat fields only
+                new_cache[path] = dict(entry, mtime_ns=st.st_mtime_ns, size=st.st_size)
+                emit(path, entry["issues"], 0.0, True)
+                continue
+            new_cache[path] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size,
+                               "sha256": digest, "issues": []}
+            pending[pool.submit(_analyze_source, path, source, disabled)] = path
+            if len(pending) >= max_pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                collect(future)
+
+    if use_cache:
+        _save_cache(cache_path, new_cache)
+
+    timings.sort(reverse=True)
+    summary = dict(counts)
+    summary["issues"] = sum(by_severity.values())
+    summary["by_severity"] = by_severity
+    summary["slowest"] = [{"path": path, "time_ms": round(ms, 3)} for ms, path in timings[:slowest]]
+    summary["time_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    output.write(json.dumps({"summary": summary}) + "\n")
+    output.flush()
+    return summary
+
+
+def main(argv=None):
+    """Command line entry point: python pygenius_analyzer.py <dir>"""
+    import argparse
+    parser = argparse.ArgumentParser(description="Analyze a directory of Python files")
+    parser.add_argument("root", help="Directory to analyze")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes")
+    parser.add_argument("--cache", default=None, help="Cache file path")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and do not write the cache")
+    parser.add_argument("-o", "--output", default=None, help="Write JSON lines here instead of stdout")
+    args = parser.parse_args(argv)
+
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        summary = analyze_project(args.root, output=output, jobs=args.jobs,
+                                  cache_path=args.cache, use_cache=not args.no_cache)
+    finally:
+        if args.output:
+            output.close()
+    return 1 if summary["by_severity"].get("high") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
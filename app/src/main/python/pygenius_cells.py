@@ -0,0 +1,214 @@
+"""
+PyGenius AI Cells - dataflow-aware re-execution of code cells
+"""
+import ast
+import re
+import time
+import hashlib
+import builtins
+import threading
+
+from pygenius_analyzer import Analyzer
+
+# "# %%" starts a new cell, as in Jupytext / VS Code / Spyder scripts
+CELL_MARKER = re.compile(r"^#\s*%%.*$", re.MULTILINE)
+
+_BUILTIN_NAMES = frozenset(dir(builtins))
+
+
+def split_cells(code):
+    """Split a script into cells at "# %%" marker lines"""
+    cells = [cell.strip("\n") for cell in CELL_MARKER.split(code)]
+    return [cell for cell in cells if cell.strip()]
+
+
+def cell_names(source):
+    """
+    Names a cell reads and writes at module level
+
+    Reads include free names used inside functions and lambdas the cell
+    defines. Cells that do not parse read and write nothing, so they always
+    run when dirty and never become anyone's dependency.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return frozenset(), frozenset()
+    analyzer = Analyzer(rules=[])
+    analyzer.collect(tree)
+    scope = analyzer.module_scope
+    reads = (scope.uses | scope.free) - _BUILTIN_NAMES
+    writes = scope.bound | set(scope.assigned) | scope.declared
+    return frozenset(reads), frozenset(writes)
+
+
+class Cell:
+    __slots__ = ("index", "source", "key", "reads", "writes", "upstream")
+
+    def __init__(self, index, source):
+        self.index = index
+        self.source = source
+        self.key = None
+        self.reads, self.writes = cell_names(source)
+        self.upstream = set()
+
+
+def build_graph(sources):
+    """
+    Build cells with their upstream dependencies
+
+    A cell depends on the latest earlier cell that writes each name it
+    reads, and on earlier cells writing the same names (re-running those
+    would clobber its values in the shared namespace). A cell's key covers
+    its source and the keys of its upstream cells, so deleting, editing or
+    reordering a producer changes the key of everything downstream.
+    """
+    cells = []
+    seen = {}
+    last_writer = {}
+    for index, source in enumerate(sources):
+        cell = Cell(index, source)
+        for name in cell.reads | cell.writes:
+            writer = last_writer.get(name)
+            if writer is not None:
+                cell.upstream.add(writer)
+        for name in cell.writes:
+            last_writer[name] = index
+        digest = hashlib.sha256(source.encode("utf-8", "surrogatepass"))
+        for upstream in sorted(cell.upstream):
+            digest.update(b"\0" + cells[upstream].key.encode())
+        digest = digest.hexdigest()
+        # Identical cells are told apart by occurrence count, not position
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+        cell.key = f"{digest}:{occurrence}"
+        cells.append(cell)
+    return cells
+
+
+class _ErrorWatch:
+    """Callback wrapper noting whether execute_code reported an error"""
+
+    def __init__(self, forward):
+        self.forward = forward
+        self.failed = False
+
+    def __call__(self, text, line_type):
+        if line_type == "error":
+            self.failed = True
+        if self.forward:
+            self.forward(text, line_type)
+
+
+class CellRunner:
+    """
+    Re-runs only changed cells and their downstream dependents
+
+    State lives in a persistent execute_code session; the runner remembers
+    which cell versions completed successfully in that session's current
+    namespace, what they wrote and how long each took. Names written only
+    by cells that are gone are dropped from the namespace; names another
+    cell still writes make that cell re-run.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.lock = threading.Lock()
+        self._namespace = None
+        self._completed = {}
+
+    def run(self, sources, callback=None):
+        import pygenius_runtime
+
+        with self.lock:
+            kernel = pygenius_runtime.get_session(self.session)
+            namespace = kernel.namespace
+            if namespace is not self._namespace:
+                # New or reset session: nothing from earlier runs survives
+                self._completed = {}
+
+            cells = build_graph(sources)
+            keys = {cell.key for cell in cells}
+            last_writer = {}
+            for cell in cells:
+                for name in cell.writes:
+                    last_writer[name] = cell.index
+            stale = set()
+            for key, (_, writes) in self._completed.items():
+                if key not in keys:
+                    stale |= writes
+            dropped = sorted(name for name in stale if name not in last_writer)
+            for name in dropped:
+                namespace.pop(name, None)
+            rewrite = {last_writer[name] for name in stale if name in last_writer}
+
+            dirty = set()
+            for cell in cells:
+                if (cell.key not in self._completed or cell.index in rewrite
+                        or cell.upstream & dirty):
+                    dirty.add(cell.index)
+
+            completed = {}
+            records = []
+            saved_ms = 0.0
+            failed = False
+            for cell in cells:
+                record = {
+                    "index": cell.index,
+                    "reads": sorted(cell.reads),
+                    "writes": sorted(cell.writes),
+                    "time_ms": 0.0,
+                }
+                if cell.index not in dirty:
+                    previous_ms = self._completed[cell.key][0]
+                    completed[cell.key] = (previous_ms, cell.writes)
+                    saved_ms += previous_ms
+                    record.update(status="skipped", saved_ms=previous_ms)
+                elif failed:
+                    record["status"] = "not_run"
+                else:
+                    watch = _ErrorWatch(callback)
+                    started = time.perf_counter()
+                    pygenius_runtime.execute_code(cell.source, watch, session=self.session)
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    record["time_ms"] = elapsed_ms
+                    if watch.failed:
+                        record["status"] = "error"
+                        failed = True
+                    else:
+                        record["status"] = "ran"
+                        completed[cell.key] = (elapsed_ms, cell.writes)
+                records.append(record)
+
+            # A memory-cap reset during the run invalidates everything
+            if kernel.namespace is not namespace:
+                completed = {}
+            self._namespace = kernel.namespace
+            self._completed = completed
+
+        return {
+            "session": self.session,
+            "cells": records,
+            "ran": sum(1 for r in records if r["status"] in ("ran", "error")),
+            "skipped": sum(1 for r in records if r["status"] == "skipped"),
+            "saved_ms": saved_ms,
+            "dropped": dropped,
+        }
+
+
+_runners = {}
+_runners_lock = threading.Lock()
+
+
+def run_cells(cells, callback=None, session="cells"):
+    """
+    Run cells (a list of sources, or one script with "# %%" markers) in a
+    persistent session, skipping cells whose inputs did not change
+    """
+    if isinstance(cells, str):
+        cells = split_cells(cells)
+    with _runners_lock:
+        runner = _runners.get(session)
+        if runner is None:
+            runner = _runners[session] = CellRunner(session)
+    return runner.run(cells, callback)
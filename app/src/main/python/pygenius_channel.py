@@ -0,0 +1,210 @@
+"""
+PyGenius AI Channel - batched, length-prefixed binary messages to the host
+"""
+import json
+import time
+import base64
+import struct
+import threading
+
+# Record layout (little endian), records back to back in each batch:
+#   type  u8   TYPE_CODES value, or NAMED_TYPE followed by the name in meta
+#   flags u8   FLAG_BINARY if the payload is raw bytes rather than UTF-8 text
+#   meta  u16  length of the metadata block (UTF-8 JSON, may be empty)
+#   size  u32  length of the payload
+RECORD_HEADER = struct.Struct("<BBHI")
+
+TYPE_CODES = {
+    "output": 1,
+    "error": 2,
+    "progress": 3,
+    "plot": 4,
+    "variables": 5,
+    "profile": 6,
+    "memory": 7,
+    "cells": 8,
+}
+TYPE_NAMES = {code: name for name, code in TYPE_CODES.items()}
+NAMED_TYPE = 255
+
+FLAG_BINARY = 1
+
+DEFAULT_BATCH_BYTES = 64 * 1024
+DEFAULT_FLUSH_INTERVAL = 0.05
+
+
+def encode_record(line_type, payload, meta=None):
+    """Encode one record as bytes"""
+    buffer = bytearray()
+    _append_record(buffer, line_type, payload, meta)
+    return bytes(buffer)
+
+
+def _append_record(buffer, line_type, payload, meta):
+    code = TYPE_CODES.get(line_type, NAMED_TYPE)
+    if code == NAMED_TYPE:
+        meta = dict(meta or {}, type=line_type)
+    meta_bytes = json.dumps(meta, separators=(",", ":")).encode() if meta else b""
+    if isinstance(payload, str):
+        flags = 0
+        payload = payload.encode("utf-8", "surrogatepass")
+    else:
+        flags = FLAG_BINARY
+        payload = memoryview(payload).cast("B")
+    buffer += RECORD_HEADER.pack(code, flags, len(meta_bytes), len(payload))
+    buffer += meta_bytes
+    buffer += payload
+
+
+def decode_batch(batch):
+    """
+    Yield (line_type, payload, meta) for every record in a batch
+
+    Text payloads come back as str, binary ones as memoryview slices of the
+    batch (no copy); meta is a dict or None.
+    """
+    view = memoryview(batch).cast("B")
+    offset = 0
+    while offset < len(view):
+        code, flags, meta_size, size = RECORD_HEADER.unpack_from(view, offset)
+        offset += RECORD_HEADER.size
+        meta = json.loads(bytes(view[offset:offset + meta_size])) if meta_size else None
+        offset += meta_size
+        payload = view[offset:offset + size]
+        offset += size
+        if not flags & FLAG_BINARY:
+            payload = str(payload, "utf-8", "surrogatepass")
+        line_type = TYPE_NAMES.get(code) or (meta or {}).pop("type", "output")
+        yield line_type, payload, meta
+
+
+class MessageChannel:
+    """
+    Buffers typed records and hands them to the host in batches
+
+    sink is called with one bytes-like batch at a time, so the host bridge is
+    crossed once per batch rather than once per output fragment. A batch is
+    flushed when it reaches batch_bytes, at the latest flush_interval seconds
+    after its first record (from a background thread if no later send does
+    it first, so quiet scripts still deliver promptly), and on
+    flush()/close(). Records sent after close() are flushed immediately. Binary payloads (PNGs, array buffers) are copied into
+    the batch as raw bytes.
+
+    The channel is also a drop-in callback(text, line_type), so it can be
+    passed anywhere the runtime takes a callback.
+    """
+
+    accepts_bytes = True
+
+    def __init__(self, sink, batch_bytes=DEFAULT_BATCH_BYTES,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.sink = sink
+        self.batch_bytes = batch_bytes
+        self.flush_interval = flush_interval
+        self._buffer = bytearray()
+        self._records = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._deadline = None
+        self._flusher = None
+        self._closed = False
+        self._last_flush = time.monotonic()
+        self.records_sent = 0
+        self.batches_sent = 0
+        self.bytes_sent = 0
+
+    def send(self, line_type, payload, meta=None):
+        """Queue one record; payload is str or any bytes-like object"""
+        with self._lock:
+            _append_record(self._buffer, line_type, payload, meta)
+            self._records += 1
+            now = time.monotonic()
+            # Once closed there is no deadline thread: late records (output
+            # flushed after the run) are delivered right away
+            if (self._closed or len(self._buffer) >= self.batch_bytes
+                    or now - self._last_flush >= self.flush_interval):
+                self._flush(now)
+            elif self._deadline is None:
+                self._deadline = now + self.flush_interval
+                if self._flusher is None:
+                    self._flusher = threading.Thread(target=self._flush_on_deadline,
+                                                     name="pygenius-channel", daemon=True)
+                    self._flusher.start()
+                else:
+                    self._wakeup.notify()
+
+    def _flush_on_deadline(self):
+        with self._lock:
+            while not self._closed:
+                if self._deadline is None:
+                    self._wakeup.wait()
+                    continue
+                remaining = self._deadline - time.monotonic()
+                if remaining > 0:
+                    self._wakeup.wait(remaining)
+                else:
+                    self._flush(time.monotonic())
+
+    def __call__(self, text, line_type):
+        self.send(line_type, text)
+
+    def _flush(self, now):
+        if not self._buffer:
+            return
+        self._deadline = None
+        batch = self._buffer
+        records = self._records
+        self._buffer = bytearray()
+        self._records = 0
+        self._last_flush = now
+        self.records_sent += records
+        self.batches_sent += 1
+        self.bytes_sent += len(batch)
+        self.sink(batch)
+
+    def flush(self):
+        with self._lock:
+            self._flush(time.monotonic())
+
+    def close(self):
+        with self._lock:
+            self._flush(time.monotonic())
+            self._closed = True
+            self._wakeup.notify()
+        if self._flusher is not None:
+            self._flusher.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "records": self.records_sent,
+                "batches": self.batches_sent,
+                "bytes": self.bytes_sent,
+                "pending_records": self._records,
+                "pending_bytes": len(self._buffer),
+            }
+
+
+def callback_sink(callback):
+    """
+    Sink that replays batches into a legacy callback(text, line_type)
+
+    Binary plot payloads are turned back into the base64 JSON text the
+    per-call path sends; other binary payloads are passed as bytes.
+    """
+    def sink(batch):
+        for line_type, payload, meta in decode_batch(batch):
+            if not isinstance(payload, str):
+                if line_type == "plot":
+                    payload = json.dumps(dict(
+                        meta or {}, data=base64.b64encode(payload).decode("ascii")))
+                else:
+                    payload = bytes(payload)
+            callback(payload, line_type)
+    return sink
@@ -0,0 +1,217 @@
+"""
+PyGenius AI Inspector - structured, size-bounded views of execution namespaces
+"""
+import sys
+import types
+from itertools import islice
+
+# Defaults for snapshot size bounds
+DEFAULT_MAX_VARS = 100
+DEFAULT_MAX_ITEMS = 50
+PREVIEW_CHARS = 80
+
+_SCALAR_TYPES = (int, float, complex, bool, str, bytes, type(None))
+_SKIP_TYPES = (types.ModuleType, types.FunctionType, types.BuiltinFunctionType, type)
+
+
+def _is_ndarray(value):
+    return type(value).__name__ == "ndarray" and hasattr(value, "nbytes")
+
+
+def _is_dataframe(value):
+    return type(value).__name__ == "DataFrame" and hasattr(value, "memory_usage")
+
+
+def _is_series(value):
+    return type(value).__name__ == "Series" and hasattr(value, "memory_usage")
+
+
+def estimate_bytes(value):
+    """
+    Cheap size estimate: nbytes for ndarray, memory_usage for pandas objects,
+    sys.getsizeof (shallow) for everything else
+    """
+    try:
+        if _is_ndarray(value):
+            return int(value.nbytes)
+        if _is_dataframe(value):
+            return int(value.memory_usage(index=True, deep=False).sum())
+        if _is_series(value):
+            return int(value.memory_usage(index=True, deep=False))
+        return sys.getsizeof(value)
+    except Exception:
+        return None
+
+
+def deep_estimate_bytes(value, sample_items=256):
+    """
+    Size estimate that includes container items, extrapolated from a sample
+    of the first sample_items elements (one level deep)
+    """
+    size = estimate_bytes(value)
+    if size is None:
+        return None
+    try:
+        if isinstance(value, dict):
+            items = list(islice(value.items(), sample_items))
+            if items:
+                sampled = sum(sys.getsizeof(k) + (estimate_bytes(v) or 0) for k, v in items)
+                size += sampled * len(value) // len(items)
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            items = list(islice(value, sample_items))
+            if items:
+                sampled = sum(estimate_bytes(v) or 0 for v in items)
+                size += sampled * len(value) // len(items)
+    except Exception:
+        pass
+    return size
+
+
+def describe(name, value):
+    """Build the structured record for one value"""
+    record = {
+        "name": name,
+        "type": type(value).__name__,
+        "len": None,
+        "shape": None,
+        "dtype": None,
+        "bytes": estimate_bytes(value),
+        "expandable": False,
+    }
+    try:
+        if _is_ndarray(value):
+            record["shape"] = list(value.shape)
+            record["dtype"] = str(value.dtype)
+            record["expandable"] = value.ndim > 0
+        elif _is_dataframe(value):
+            record["shape"] = list(value.shape)
+            record["dtype"] = ",".join(sorted({str(d) for d in value.dtypes}))
+            record["expandable"] = True
+        elif _is_series(value):
+            record["shape"] = list(value.shape)
+            record["dtype"] = str(value.dtype)
+        elif isinstance(value, _SCALAR_TYPES):
+            truncated = False
+            if isinstance(value, (str, bytes)):
+                record["len"] = len(value)
+                # Only repr what can be shown; huge strings stay O(1) here
+                truncated = len(value) > PREVIEW_CHARS
+                value = value[:PREVIEW_CHARS]
+            text = repr(value)
+            if len(text) > PREVIEW_CHARS or truncated:
+                text = text[:PREVIEW_CHARS - 3] + "..."
+            record["preview"] = text
+        elif isinstance(value, (list, tuple, dict, set, frozenset)):
+            record["len"] = len(value)
+            record["expandable"] = len(value) > 0
+        elif hasattr(value, "__dict__") and not isinstance(value, _SKIP_TYPES):
+            record["expandable"] = bool(vars(value))
+    except Exception:
+        pass
+    return record
+
+
+def _children(value):
+    """Yield (name, child) pairs for one drill-down level"""
+    if isinstance(value, dict):
+        return ((repr(k), v) for k, v in value.items())
+    if isinstance(value, (list, tuple)) or _is_ndarray(value):
+        return ((str(i), v) for i, v in enumerate(value))
+    if isinstance(value, (set, frozenset)):
+        return ((str(i), v) for i, v in enumerate(value))
+    if _is_dataframe(value):
+        return ((str(col), value[col]) for col in value.columns)
+    if hasattr(value, "__dict__"):
+        return ((k, v) for k, v in vars(value).items() if not k.startswith("_"))
+    return iter(())
+
+
+def _child_count(value):
+    if _is_ndarray(value):
+        return len(value) if value.ndim else 0
+    if _is_dataframe(value):
+        return len(value.columns)
+    if isinstance(value, (list, tuple, dict, set, frozenset)):
+        return len(value)
+    if hasattr(value, "__dict__"):
+        return sum(1 for k in vars(value) if not k.startswith("_"))
+    return 0
+
+
+def resolve_path(namespace, path):
+    """
+    Follow a drill-down path from a namespace
+
+    path is a list whose first element is a variable name; later elements
+    are list/array indexes, dict keys (or the key's position when the key
+    itself is not JSON-friendly), DataFrame column names or attribute names.
+    Raises KeyError if the path does not resolve.
+    """
+    if not path:
+        raise KeyError("empty path")
+    value = namespace[path[0]]
+    for step in path[1:]:
+        if isinstance(value, dict):
+            if step in value:
+                value = value[step]
+            elif isinstance(step, int) and 0 <= step < len(value):
+                value = next(islice(value.values(), step, None))
+            else:
+                raise KeyError(step)
+        elif isinstance(value, (set, frozenset)):
+            if not isinstance(step, int) or not 0 <= step < len(value):
+                raise KeyError(step)
+            value = next(islice(value, step, None))
+        elif _is_dataframe(value):
+            if step not in value.columns:
+                raise KeyError(step)
+            value = value[step]
+        elif isinstance(value, (list, tuple)) or _is_ndarray(value):
+            try:
+                value = value[int(step)]
+            except (IndexError, ValueError, TypeError):
+                raise KeyError(step)
+        elif hasattr(value, "__dict__") and isinstance(step, str) and step in vars(value):
+            value = vars(value)[step]
+        else:
+            raise KeyError(step)
+    return value
+
+
+def snapshot(namespace, path=None, max_vars=DEFAULT_MAX_VARS,
+             max_items=DEFAULT_MAX_ITEMS, skip=()):
+    """
+    Structured snapshot of a namespace, or of one container inside it
+
+    Args:
+        namespace: Dict of variables (an execution namespace)
+        path: Optional drill-down path (see resolve_path)
+        max_vars: Maximum number of top-level variables reported
+        max_items: Maximum number of children reported when drilling down
+        skip: Names to leave out at the top level
+
+    Returns:
+        Dict with "variables" (list of records), "total" and "truncated";
+        drill-downs also carry "path" and the container's own "record"
+    """
+    if path:
+        value = resolve_path(namespace, path)
+        children = [describe(name, child) for name, child in islice(_children(value), max_items)]
+        total = _child_count(value)
+        return {
+            "path": list(path),
+            "record": describe(str(path[-1]), value),
+            "variables": children,
+            "total": total,
+            "truncated": total > len(children),
+        }
+
+    records = []
+    total = 0
+    for name, value in list(namespace.items()):
+        if name.startswith("_") or name in skip or isinstance(value, _SKIP_TYPES):
+            continue
+        total += 1
+        if len(records) < max_vars:
+            records.append(describe(name, value))
+    return {"variables": records, "total": total, "truncated": total > len(records)}
@@ -0,0 +1,219 @@
+"""
+PyGenius AI Memo - result cache for deterministic code runs
+"""
+import ast
+import sys
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Comment that opts a snippet out of result caching
+NO_CACHE_MARKER = "pygenius: no-cache"
+
+DEFAULT_MAX_ENTRIES = 128
+# Runs whose recorded output is larger than this are not kept
+DEFAULT_MAX_ENTRY_BYTES = 256 * 1024
+
+# Modules whose use makes a run depend on randomness, time, I/O or the host
+NONDETERMINISTIC_MODULES = frozenset({
+    "random", "secrets", "uuid", "time", "datetime", "calendar",
+    "os", "sys", "io", "pathlib", "shutil", "glob", "tempfile", "fileinput",
+    "pickle", "shelve", "sqlite3", "csv", "logging", "getpass", "platform",
+    "subprocess", "socket", "ssl", "select", "urllib", "http", "ftplib",
+    "smtplib", "requests", "threading", "multiprocessing", "concurrent",
+    "asyncio", "signal", "gc", "tracemalloc", "ctypes", "importlib",
+    "webbrowser",
+})
+
+# Builtins that read input, touch files or depend on process state
+NONDETERMINISTIC_BUILTINS = frozenset({
+    "input", "open", "breakpoint", "exec", "eval", "compile", "__import__",
+    "globals", "locals", "vars", "id", "help", "exit", "quit",
+})
+
+# Attribute names that mean randomness, clocks or file I/O on any object,
+# e.g. np.random, pd.Timestamp.now, df.to_csv, plt.savefig
+NONDETERMINISTIC_ATTRS = frozenset({
+    "random", "now", "today", "utcnow", "urlopen",
+    "save", "savez", "savez_compressed", "savetxt", "tofile", "savefig",
+    "load", "loadtxt", "fromfile", "genfromtxt", "memmap",
+    "to_csv", "to_json", "to_excel", "to_parquet", "to_pickle", "to_sql",
+    "to_hdf", "to_feather", "to_html", "to_latex", "to_clipboard",
+})
+
+
+def find_nondeterminism(code):
+    """
+    Reasons why a snippet may not give the same result every run
+
+    An empty list means the snippet is treated as deterministic. Code that
+    does not parse is cacheable (it always fails the same way).
+    """
+    if NO_CACHE_MARKER in code:
+        return [f"marked '{NO_CACHE_MARKER}'"]
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return []
+
+    reasons = []
+    # Names bound by imports of nondeterministic modules, e.g. rand from
+    # "from numpy.random import rand" or npr from "import numpy.random as npr"
+    tainted = {}
+    names = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if _is_nondeterministic_module(alias.name):
+                    reasons.append((node.lineno, f"imports {alias.name}"))
+                    tainted[alias.asname or alias.name.partition(".")[0]] = alias.name
+        elif isinstance(node, ast.ImportFrom) and not node.level:
+            module = node.module or ""
+            module_flagged = _is_nondeterministic_module(module)
+            for alias in node.names:
+                # "from numpy import random" imports numpy.random
+                source = module if module_flagged else f"{module}.{alias.name}"
+                if module_flagged or _is_nondeterministic_module(source):
+                    reasons.append((node.lineno, f"imports {alias.name} from {module}"))
+                    if alias.name != "*":
+                        tainted[alias.asname or alias.name] = source
+        elif isinstance(node, ast.Name):
+            names.append(node)
+
+        if isinstance(node, ast.Name) and node.id in NONDETERMINISTIC_BUILTINS:
+            reasons.append((node.lineno, f"uses {node.id}()"))
+        elif isinstance(node, ast.Attribute) and (
+                node.attr in NONDETERMINISTIC_ATTRS or node.attr.startswith("read_")):
+            reasons.append((node.lineno, f"uses .{node.attr}"))
+    for node in names:
+        if isinstance(node.ctx, ast.Load) and node.id in tainted:
+            reasons.append((node.lineno, f"uses {node.id} from {tainted[node.id]}"))
+    return [f"line {line}: {reason}" for line, reason in sorted(set(reasons))]
+
+
+def _is_nondeterministic_module(path):
+    """True if any component of a dotted module path is nondeterministic"""
+    return any(part in NONDETERMINISTIC_MODULES for part in path.split("."))
+
+
+def environment_fingerprint():
+    """Hash of the Python version and the installed package set"""
+    from pygenius_packages import list_installed
+    digest = hashlib.sha256(sys.version.encode())
+    for package in list_installed():
+        digest.update(f"\0{package['name'].lower()}=={package['version']}".encode())
+    return digest.hexdigest()
+
+
+class _Recorder:
+    """Callback that forwards to the caller's callback and keeps the stream"""
+
+    def __init__(self, forward, max_bytes):
+        self.forward = forward
+        self.max_bytes = max_bytes
+        self.events = []
+        self.size = 0
+        self.failed = False
+
+    def __call__(self, text, line_type):
+        if line_type == "error":
+            self.failed = True
+        if self.events is not None:
+            self.size += len(text)
+            if self.size > self.max_bytes:
+                self.events = None
+            else:
+                self.events.append((text, line_type))
+        if self.forward:
+            self.forward(text, line_type)
+
+
+class ResultCache:
+    """
+    LRU cache of execute_code results for deterministic snippets
+
+    Entries are keyed by a hash of the source and the runtime environment
+    and hold the returned text plus the recorded callback stream, which is
+    replayed on a hit instead of executing. Runs that report an error are
+    never stored.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_entry_bytes=DEFAULT_MAX_ENTRY_BYTES):
+        self.max_entries = max_entries
+        self.max_entry_bytes = max_entry_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(code, environment):
+        digest = hashlib.sha256(environment.encode())
+        digest.update(b"\0")
+        digest.update(code.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def run(self, code, execute, callback=None):
+        """
+        Return execute(callback)'s result for code, replaying a cached run
+        when there is one
+
+        Args:
+            code: Source being executed
+            execute: Function taking a callback and returning the result text
+            callback: Caller's (text, line_type) callback
+        """
+        if find_nondeterminism(code):
+            with self._lock:
+                self.uncacheable += 1
+            return execute(callback)
+
+        key = self.key(code, environment_fingerprint())
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if entry is not None:
+            result, events = entry
+            if callback:
+                for text, line_type in events:
+                    callback(text, line_type)
+            return result
+
+        recorder = _Recorder(callback, self.max_entry_bytes)
+        result = execute(recorder)
+        if not recorder.failed and recorder.events is not None:
+            with self._lock:
+                self._entries[key] = (result, tuple(recorder.events))
+                self._trim()
+        return result
+
+    def _trim(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def resize(self, max_entries):
+        with self._lock:
+            self.max_entries = max_entries
+            self._trim()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "uncacheable": self.uncacheable,
+                "evictions": self.evictions,
+            }
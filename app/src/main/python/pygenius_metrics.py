@@ -0,0 +1,273 @@
+"""
+PyGenius AI Metrics - counters, gauges and latency histograms for the runtime
+"""
+import time
+import _thread
+from bisect import bisect_left
+
+# Latency buckets in seconds (upper bounds; +Inf is implicit)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = _thread.allocate_lock()
+
+    def labels(self, *values):
+        """Child metric for one combination of label values (cache it on hot paths)"""
+        values = tuple(str(v) for v in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _samples(self):
+        return list(self._children.items())
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0
+        self._lock = _thread.allocate_lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def reset(self):
+        self.value = 0
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    kind = "counter"
+    _new_child = _CounterChild
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+
+class _GaugeChild:
+    __slots__ = ("value", "function")
+
+    def __init__(self):
+        self.value = 0
+        self.function = None
+
+    def set(self, value):
+        self.value = value
+
+    def reset(self):
+        self.value = 0
+
+    def get(self):
+        if self.function is not None:
+            try:
+                return self.function()
+            except Exception:
+                return float("nan")
+        return self.value
+
+
+class Gauge(_Metric):
+    """Value that goes up and down; set_function() computes it at export time"""
+    kind = "gauge"
+    _new_child = _GaugeChild
+
+    def set(self, value):
+        self.labels().set(value)
+
+    def set_function(self, function):
+        self.labels().function = function
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count", "_lock")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = _thread.allocate_lock()
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def reset(self):
+        with self._lock:
+            self.counts = [0] * (len(self.buckets) + 1)
+            self.sum = 0.0
+            self.count = 0
+
+
+class Histogram(_Metric):
+    """Distribution of observed values (latencies in seconds) in fixed buckets"""
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+
+class Registry:
+    """Named metrics with JSON and Prometheus text exports"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = _thread.allocate_lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name!r} already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def reset(self):
+        """
+        Zero every value in place, so children bound by instrumented code
+        keep recording (set_function gauges keep their function)
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            for _, child in metric._samples():
+                child.reset()
+
+    def collect(self):
+        """All metrics as a JSON-friendly dict"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        data = {}
+        for metric in metrics:
+            samples = []
+            for values, child in metric._samples():
+                sample = {"labels": dict(zip(metric.labelnames, values))}
+                if metric.kind == "counter":
+                    sample["value"] = child.value
+                elif metric.kind == "gauge":
+                    sample["value"] = child.get()
+                else:
+                    # Unused latency series would be all-zero bucket rows
+                    if not child.count:
+                        continue
+                    with child._lock:
+                        counts = list(child.counts)
+                        sample.update(count=child.count, sum=child.sum)
+                    sample["buckets"] = dict(zip([*map(str, metric.buckets), "+Inf"], counts))
+                samples.append(sample)
+            data[metric.name] = {"type": metric.kind, "help": metric.help, "samples": samples}
+        return data
+
+    def to_json(self):
+        import json
+        return json.dumps(self.collect())
+
+    def to_prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for name, metric in self.collect().items():
+            lines.append(f"# HELP {name} {_escape_help(metric['help'])}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            for sample in metric["samples"]:
+                labels = sample["labels"]
+                if metric["type"] != "histogram":
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(sample['value'])}")
+                    continue
+                cumulative = 0
+                for bound, count in sample["buckets"].items():
+                    cumulative += count
+                    bucket_labels = dict(labels, le=bound)
+                    lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(sample['sum'])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {sample['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_help(text):
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        if value != value:
+            return "NaN"
+        if value in (float("inf"), float("-inf")):
+            return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+registry = Registry()
+
+call_errors = registry.counter(
+    "pygenius_call_exceptions_total", "Public runtime calls that raised", ("function",))
+# The histogram's _count doubles as the call counter
+call_seconds = registry.histogram(
+    "pygenius_call_duration_seconds", "Latency of public runtime functions", ("function",))
+
+
+def instrumented(func):
+    """Record latency (and with it the call count) and exceptions of a function"""
+    name = func.__name__
+    errors = call_errors.labels(name)
+    observe = call_seconds.labels(name).observe
+    clock = time.perf_counter
+
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return func(*args, **kwargs)
+        except BaseException:
+            errors.inc()
+            raise
+        finally:
+            observe(clock() - start)
+
+    # functools.wraps without importing functools on the cold-start path
+    for attr in ("__module__", "__name__", "__qualname__", "__doc__"):
+        setattr(wrapper, attr, getattr(func, attr))
+    wrapper.__dict__.update(func.__dict__)
+    wrapper.__wrapped__ = func
+    return wrapper
@@ -0,0 +1,201 @@
+"""
+PyGenius AI Output Store - spill-to-disk storage for very large script output
+"""
+import os
+import mmap
+import tempfile
+import threading
+from array import array
+
+# The line index keeps one offset per this many lines; lines in between
+# are found by scanning the stored bytes
+LINE_BLOCK = 1024
+
+
+class OutputStore:
+    """
+    Append-only text store that keeps recent output in memory and spills
+    older output to a temp file
+
+    Text is stored as UTF-8 together with a sparse index holding the start
+    offset of every LINE_BLOCK-th line, so callers can page through the
+    full output without joining it into one string and the index stays a
+    small fraction of the output size. Spilled bytes are read back through
+    an mmap.
+
+    Args:
+        memory_limit: Bytes kept in memory before older output is spilled
+        spill_dir: Directory for the spill file (defaults to the system temp dir)
+    """
+
+    def __init__(self, memory_limit=1 << 20, spill_dir=None):
+        self.memory_limit = memory_limit
+        self.spill_dir = spill_dir
+        self._lock = threading.Lock()
+        self._memory = bytearray()
+        self._spill = None
+        self._spilled = 0
+        self._map = None
+        self._block_starts = array("Q", [0])
+        self._newlines = 0
+        self._last_line_start = 0
+        self.size = 0
+
+    def write(self, text):
+        if not text:
+            return 0
+        data = text.encode("utf-8", "replace")
+        with self._lock:
+            count = data.count(b"\n")
+            if count:
+                self._index_lines(data, count)
+            self._memory += data
+            self.size += len(data)
+            if len(self._memory) > self.memory_limit:
+                self._spill_older()
+        return len(text)
+
+    def _index_lines(self, data, count):
+        # Line n starts after the n-th newline; record every LINE_BLOCK-th
+        base = self.size
+        seen = self._newlines
+        mark = len(self._block_starts) * LINE_BLOCK
+        find = data.find
+        pos = -1
+        while self._newlines + count >= mark:
+            for _ in range(mark - seen):
+                pos = find(b"\n", pos + 1)
+            seen = mark
+            self._block_starts.append(base + pos + 1)
+            mark += LINE_BLOCK
+        self._newlines += count
+        self._last_line_start = base + data.rindex(b"\n") + 1
+
+    def _find_newline(self, pos):
+        """Offset of the first newline at or after pos, or -1"""
+        if pos < self._spilled:
+            found = self._spilled_view().find(b"\n", pos)
+            if found != -1:
+                return found
+            pos = self._spilled
+        found = self._memory.find(b"\n", pos - self._spilled)
+        return found + self._spilled if found != -1 else -1
+
+    def _skip_lines(self, pos, lines):
+        """Offset just past the lines-th newline from pos (size if fewer)"""
+        for _ in range(lines):
+            found = self._find_newline(pos)
+            if found == -1:
+                return self.size
+            pos = found + 1
+        return pos
+
+    def _line_start(self, line):
+        block, rest = divmod(line, LINE_BLOCK)
+        return self._skip_lines(self._block_starts[block], rest)
+
+    def _spill_older(self):
+        # Keep the newest half of the budget in memory, move the rest to disk
+        keep = self.memory_limit // 2
+        count = len(self._memory) - keep
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile(prefix="pygenius-output-", dir=self.spill_dir)
+        self._spill.seek(0, os.SEEK_END)
+        self._spill.write(self._memory[:count])
+        self._spill.flush()
+        del self._memory[:count]
+        self._spilled += count
+        self._close_map()
+
+    def _close_map(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def _spilled_view(self):
+        if self._map is None:
+            self._map = mmap.mmap(self._spill.fileno(), self._spilled, access=mmap.ACCESS_READ)
+        return self._map
+
+    def read(self, offset, length):
+        """Read up to length bytes starting at byte offset"""
+        with self._lock:
+            return self._read(offset, length)
+
+    def _read(self, offset, length):
+        end = min(offset + length, self.size)
+        if offset >= end:
+            return b""
+        parts = []
+        if offset < self._spilled:
+            parts.append(self._spilled_view()[offset:min(end, self._spilled)])
+        if end > self._spilled:
+            start = max(offset, self._spilled) - self._spilled
+            parts.append(bytes(self._memory[start:end - self._spilled]))
+        return b"".join(parts)
+
+    @property
+    def line_count(self):
+        with self._lock:
+            return self._line_count()
+
+    def _line_count(self):
+        # Text after the last newline is one more (unterminated) line
+        trailing = self._last_line_start < self.size
+        return self._newlines + (1 if trailing else 0)
+
+    def get_lines(self, start, count):
+        """Return lines [start, start + count) without trailing newlines"""
+        with self._lock:
+            total = self._line_count()
+            start = max(0, start)
+            stop = min(total, start + count)
+            if start >= stop:
+                return []
+            begin = self._line_start(start)
+            end = self._skip_lines(begin, stop - start)
+            text = self._read(begin, end - begin).decode("utf-8", "replace")
+        lines = text.split("\n")
+        if lines and lines[-1] == "":
+            lines.pop()
+        return lines
+
+    def page(self, page_number, page_size=200):
+        """Return one page of lines plus paging metadata"""
+        total = self.line_count
+        return {
+            "page": page_number,
+            "page_size": page_size,
+            "total_lines": total,
+            "total_pages": (total + page_size - 1) // page_size,
+            "total_bytes": self.size,
+            "lines": self.get_lines(page_number * page_size, page_size),
+        }
+
+    def getvalue(self):
+        """Full output as one string (avoid for huge outputs; prefer page())"""
+        with self._lock:
+            return self._read(0, self.size).decode("utf-8", "replace")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "total_bytes": self.size,
+                "memory_bytes": len(self._memory),
+                "spilled_bytes": self._spilled,
+                "lines": self._line_count(),
+            }
+
+    def close(self):
+        with self._lock:
+            self._close_map()
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
+            self._memory = bytearray()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
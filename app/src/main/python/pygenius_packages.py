@@ -0,0 +1,230 @@
+"""
+PyGenius AI Packages - cached package listing and batched pip installs
+"""
+import os
+import sys
+import json
+import sysconfig
+import threading
+import subprocess
+from collections import deque
+
+INDEX_FORMAT = 1
+
+# Lines of pip output kept for the failure message of a batch install
+_OUTPUT_TAIL_LINES = 20
+
+_lock = threading.Lock()
+_index = None
+_index_path = None
+
+
+def _default_index_path():
+    from pygenius_runtime import _cache_dir
+    return os.path.join(_cache_dir(), "packages.json")
+
+
+def _search_dirs():
+    """sys.path entries that are real directories, in import order"""
+    seen = set()
+    dirs = []
+    for entry in sys.path:
+        path = os.path.abspath(entry or os.getcwd())
+        if path not in seen and os.path.isdir(path):
+            seen.add(path)
+            dirs.append(path)
+    return dirs
+
+
+def _scan_dir(path):
+    """Read name/version of every distribution installed in one directory"""
+    from importlib import metadata
+    packages = []
+    for dist in metadata.distributions(path=[path]):
+        name = dist.metadata["Name"]
+        if name:
+            packages.append({"name": name, "version": dist.version})
+    return packages
+
+
+def _load_index(path):
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("format") != INDEX_FORMAT or data.get("python") != sys.version:
+        return {}
+    return data.get("dirs", {})
+
+
+def _save_index(path, dirs):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump({"format": INDEX_FORMAT, "python": sys.version, "dirs": dirs}, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def list_installed(index_path=None):
+    """
+    List installed distributions as [{"name", "version"}] sorted by name
+
+    Results are indexed per sys.path directory and keyed by that directory's
+    mtime, both in memory and on disk, so only directories that changed
+    since the last call (e.g. after pip install) are rescanned.
+    """
+    global _index, _index_path
+    with _lock:
+        path = index_path or _index_path or _default_index_path()
+        if _index is None or path != _index_path:
+            _index = _load_index(path)
+            _index_path = path
+
+        changed = False
+        by_name = {}
+        for directory in _search_dirs():
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+            entry = _index.get(directory)
+            if entry is None or entry["mtime_ns"] != mtime_ns:
+                entry = {"mtime_ns": mtime_ns, "packages": _scan_dir(directory)}
+                _index[directory] = entry
+                changed = True
+            for package in entry["packages"]:
+                # First directory on sys.path wins, as with imports
+                by_name.setdefault(package["name"].lower(), package)
+
+        if changed:
+            _save_index(path, _index)
+
+    return sorted(by_name.values(), key=lambda p: p["name"].lower())
+
+
+def invalidate(paths=None):
+    """
+    Force a rescan of the install directories (default: purelib, platlib and
+    the user site) on the next listing, for filesystems with coarse mtimes
+    """
+    if paths is None:
+        install_paths = sysconfig.get_paths()
+        paths = [install_paths.get("purelib"), install_paths.get("platlib")]
+        try:
+            import site
+            paths.append(site.getusersitepackages())
+        except (ImportError, AttributeError):
+            pass
+    with _lock:
+        if _index is None:
+            return
+        for path in paths:
+            if path:
+                _index.pop(os.path.abspath(path), None)
+
+
+def default_wheelhouse():
+    from pygenius_runtime import _cache_dir
+    path = os.path.join(_cache_dir(), "wheelhouse")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _run_pip(args, callback=None, cancel_event=None, quiet_errors=False):
+    """
+    Run one pip command, streaming its output lines to callback as they
+    arrive; the process is terminated if cancel_event gets set
+
+    Returns:
+        (returncode, cancelled, last output lines)
+    """
+    env = dict(os.environ, PYTHONUNBUFFERED="1", PIP_DISABLE_PIP_VERSION_CHECK="1")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "pip"] + args + ["--progress-bar", "off"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+        env=env,
+    )
+    finished = threading.Event()
+    cancelled = []
+
+    def watch():
+        while not finished.is_set():
+            if cancel_event.wait(0.1):
+                cancelled.append(True)
+                process.terminate()
+                return
+
+    if cancel_event is not None:
+        threading.Thread(target=watch, daemon=True).start()
+
+    tail = deque(maxlen=_OUTPUT_TAIL_LINES)
+    try:
+        for line in process.stdout:
+            line = line.rstrip()
+            if not line:
+                continue
+            tail.append(line)
+            if callback and not (quiet_errors and line.startswith("ERROR:")):
+                callback(line, "progress")
+        returncode = process.wait()
+    finally:
+        finished.set()
+        process.stdout.close()
+    return returncode, bool(cancelled), list(tail)
+
+
+def install_batch(packages, callback=None, wheelhouse=None, cancel_event=None):
+    """
+    Install several packages with as few pip invocations as possible
+
+    First tries an offline install from the local wheelhouse. If something is
+    missing, one `pip wheel` run resolves and downloads every requested
+    package (reusing wheels already in the wheelhouse) and one offline
+    `pip install` installs them, so later installs of the same packages need
+    no network.
+
+    Args:
+        packages: Requirement strings, e.g. ["numpy", "requests>=2"]
+        callback: Function called with (line, "progress") for each pip line
+        wheelhouse: Wheel cache directory (defaults to the runtime cache dir)
+        cancel_event: threading.Event; setting it terminates pip
+
+    Returns:
+        Dict with ok, cancelled, offline (installed purely from the
+        wheelhouse), returncode and output (last lines of pip output)
+    """
+    packages = list(packages)
+    wheelhouse = wheelhouse or default_wheelhouse()
+    local = ["--no-index", "--find-links", wheelhouse]
+    result = {"ok": False, "cancelled": False, "offline": False,
+              "returncode": None, "output": []}
+
+    try:
+        if callback:
+            callback(f"Installing {', '.join(packages)} from local wheel cache...", "progress")
+        code, cancelled, tail = _run_pip(["install"] + local + packages,
+                                         callback, cancel_event, quiet_errors=True)
+        if code == 0 or cancelled:
+            result.update(ok=code == 0, cancelled=cancelled, offline=code == 0,
+                          returncode=code, output=tail)
+            return result
+
+        if callback:
+            callback("Downloading missing packages into the wheel cache...", "progress")
+        code, cancelled, tail = _run_pip(
+            ["wheel", "--wheel-dir", wheelhouse, "--find-links", wheelhouse] + packages,
+            callback, cancel_event)
+        if code == 0 and not cancelled:
+            code, cancelled, tail = _run_pip(["install"] + local + packages,
+                                             callback, cancel_event)
+        result.update(ok=code == 0 and not cancelled, cancelled=cancelled,
+                      returncode=code, output=tail)
+        return result
+    finally:
+        invalidate()
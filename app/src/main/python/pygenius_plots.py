@@ -0,0 +1,304 @@
+"""
+PyGenius AI Plots - matplotlib figure capture rendered off the main thread
+"""
+import io
+import os
+import sys
+import json
+import base64
+import hashlib
+import threading
+import warnings
+from collections import OrderedDict
+
+# Lines with more points than this are decimated before rasterizing
+MAX_LINE_POINTS = 4000
+# Figures rendered per execution; extra figures are closed unrendered
+MAX_FIGURES = 20
+RENDER_CACHE_SIZE = 32
+RENDER_WORKERS = 2
+
+_render_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_executor = None
+_executor_lock = threading.Lock()
+_pending = set()
+
+
+def use_agg():
+    """
+    Force the non-interactive Agg backend, also when matplotlib was already
+    imported with another one
+    """
+    os.environ["MPLBACKEND"] = "Agg"
+    # plt.show() is a no-op here; figures are captured after the run instead
+    warnings.filterwarnings("ignore", message=".*non-interactive.*")
+    matplotlib = sys.modules.get("matplotlib")
+    if matplotlib is not None and matplotlib.get_backend().lower() != "agg":
+        pyplot = sys.modules.get("matplotlib.pyplot")
+        if pyplot is not None:
+            pyplot.switch_backend("Agg")
+        else:
+            matplotlib.use("Agg")
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            _executor = ThreadPoolExecutor(RENDER_WORKERS, thread_name_prefix="pygenius-plot")
+        return _executor
+
+
+def wait_idle(timeout=None):
+    """Wait for renders still running (they may hold figures user code can reach)"""
+    with _cache_lock:
+        pending = list(_pending)
+    if pending:
+        from concurrent.futures import wait
+        wait(pending, timeout=timeout)
+
+
+def decimate(x, y, max_points=MAX_LINE_POINTS):
+    """
+    Min/max decimation: split the line into max_points // 2 buckets and keep
+    each bucket's lowest and highest point, so peaks survive rasterizing
+
+    Returns:
+        (x, y) with at most max_points points, in original order
+    """
+    import numpy as np
+    y = np.asarray(y)
+    count = len(y)
+    buckets = max(1, max_points // 2)
+    if count <= max_points or y.ndim != 1 or y.dtype.kind not in "iuf":
+        return x, y
+    size = -(-count // buckets)
+    padded = np.full(size * buckets, np.nan)
+    padded[:count] = y
+    blocks = padded.reshape(buckets, size)
+    valid = ~np.isnan(blocks).all(axis=1)
+    offsets = np.arange(buckets) * size
+    low = np.nanargmin(np.where(valid[:, None], blocks, 0), axis=1) + offsets
+    high = np.nanargmax(np.where(valid[:, None], blocks, 0), axis=1) + offsets
+    keep = np.unique(np.concatenate([low[valid], high[valid], [0, count - 1]]))
+    keep = keep[keep < count]
+    return np.asarray(x)[keep], y[keep]
+
+
+def _downsample_lines(figure, max_points):
+    """Decimate huge lines in place; returns how many were reduced"""
+    from matplotlib.lines import Line2D
+    reduced = 0
+    for line in figure.findobj(Line2D):
+        x, y = line.get_xdata(orig=False), line.get_ydata(orig=False)
+        if len(y) > max_points and len(x) == len(y):
+            new_x, new_y = decimate(x, y, max_points)
+            if len(new_y) < len(y):
+                line.set_data(new_x, new_y)
+                reduced += 1
+    return reduced
+
+
+def _array_bytes(value):
+    import numpy as np
+    try:
+        return np.ascontiguousarray(np.ma.filled(value, np.nan)).tobytes()
+    except (TypeError, ValueError):
+        return repr(value).encode()
+
+
+def _artist_state(artist):
+    """Values that decide what one artist looks like"""
+    from matplotlib.axes import Axes
+    from matplotlib.collections import Collection
+    from matplotlib.image import AxesImage
+    from matplotlib.lines import Line2D
+    from matplotlib.patches import Patch
+    from matplotlib.text import Text
+
+    state = [type(artist).__name__, artist.get_visible(), artist.get_alpha(),
+             artist.get_zorder(), artist.get_label()]
+    if isinstance(artist, Line2D):
+        state += [_array_bytes(artist.get_xydata()), artist.get_color(),
+                  artist.get_linestyle(), artist.get_linewidth(),
+                  artist.get_marker(), artist.get_markersize(),
+                  artist.get_markerfacecolor(), artist.get_drawstyle()]
+    elif isinstance(artist, Text):
+        state += [artist.get_text(), artist.get_position(), artist.get_color(),
+                  artist.get_fontsize(), artist.get_rotation(),
+                  artist.get_ha(), artist.get_va(), artist.get_weight()]
+    elif isinstance(artist, Collection):
+        state += [_array_bytes(artist.get_offsets()),
+                  _array_bytes(artist.get_facecolor()),
+                  _array_bytes(artist.get_edgecolor()),
+                  _array_bytes(artist.get_sizes()) if hasattr(artist, "get_sizes") else b"",
+                  _array_bytes(artist.get_array()) if artist.get_array() is not None else b"",
+                  artist.get_cmap().name, artist.get_clim()]
+        state += [_array_bytes(path.vertices) for path in artist.get_paths()]
+    elif isinstance(artist, AxesImage):
+        state += [_array_bytes(artist.get_array()), artist.get_extent(),
+                  artist.get_cmap().name, artist.get_clim(),
+                  artist.get_interpolation()]
+    elif isinstance(artist, Patch):
+        state += [_array_bytes(artist.get_path().vertices),
+                  _array_bytes(artist.get_patch_transform().get_matrix()),
+                  artist.get_facecolor(), artist.get_edgecolor(),
+                  artist.get_linewidth(), artist.get_hatch()]
+    elif isinstance(artist, Axes):
+        state += [artist.get_xlim(), artist.get_ylim(), artist.get_xscale(),
+                  artist.get_yscale(), artist.get_position().bounds,
+                  artist.axison, artist.get_aspect()]
+    return state
+
+
+def figure_hash(figure, dpi):
+    """Content hash of a figure: size, dpi and the state of every artist"""
+    digest = hashlib.sha256(repr((tuple(figure.get_size_inches()), dpi,
+                                  figure.get_facecolor())).encode())
+    for artist in figure.findobj():
+        for value in _artist_state(artist):
+            digest.update(value if isinstance(value, bytes) else repr(value).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _render(figure, dpi):
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="png", dpi=dpi)
+    return buffer.getvalue()
+
+
+def _cached_render(key):
+    with _cache_lock:
+        png = _render_cache.get(key)
+        if png is not None:
+            _render_cache.move_to_end(key)
+        return png
+
+
+def _store_render(key, png):
+    with _cache_lock:
+        _render_cache[key] = png
+        while len(_render_cache) > RENDER_CACHE_SIZE:
+            _render_cache.popitem(last=False)
+
+
+class PlotCapture:
+    """One captured figure whose PNG is rendered in the background"""
+
+    def __init__(self, number, key, dpi, size, downsampled, png=None, future=None):
+        self.number = number
+        self.key = key
+        self.dpi = dpi
+        self.size = size
+        self.downsampled = downsampled
+        self.cached = png is not None
+        self._png = png
+        self._future = future
+
+    def png(self, timeout=None):
+        """PNG bytes, waiting for the render if it is still running"""
+        if self._png is None:
+            self._png = self._future.result(timeout)
+        return self._png
+
+    def metadata(self):
+        return {
+            "figure": self.number,
+            "format": "png",
+            "width": round(self.size[0] * self.dpi),
+            "height": round(self.size[1] * self.dpi),
+            "dpi": self.dpi,
+            "hash": self.key,
+            "cached": self.cached,
+            "downsampled_lines": self.downsampled,
+        }
+
+    def payload(self, timeout=None):
+        """JSON text sent as a "plot" callback"""
+        return json.dumps(dict(self.metadata(),
+                               data=base64.b64encode(self.png(timeout)).decode("ascii")))
+
+
+def capture_figures(render=True, dpi=None, max_points=MAX_LINE_POINTS):
+    """
+    Take every open pyplot figure, close it and start rendering it
+
+    Figures are detached from pyplot on the calling thread (so the next run
+    starts with none open) and rasterized on worker threads; identical
+    figures reuse an earlier render.
+
+    Args:
+        render: False to only close the figures
+        dpi: Render resolution (defaults to each figure's own dpi)
+        max_points: Decimate lines longer than this first
+
+    Returns:
+        List of PlotCapture, in figure-number order
+    """
+    pyplot = sys.modules.get("matplotlib.pyplot")
+    if pyplot is None:
+        return []
+    numbers = pyplot.get_fignums()
+    figures = [pyplot.figure(number) for number in numbers]
+    pyplot.close("all")
+    if not render:
+        return []
+
+    captures = []
+    for number, figure in zip(numbers[:MAX_FIGURES], figures):
+        figure_dpi = dpi or figure.dpi
+        try:
+            downsampled = _downsample_lines(figure, max_points)
+            key = figure_hash(figure, figure_dpi)
+        except Exception:
+            downsampled, key = 0, None
+        size = tuple(figure.get_size_inches())
+        png = _cached_render(key) if key else None
+        if png is not None:
+            captures.append(PlotCapture(number, key, figure_dpi, size, downsampled, png=png))
+            continue
+        future = _get_executor().submit(_render_and_store, figure, figure_dpi, key)
+        with _cache_lock:
+            _pending.add(future)
+        future.add_done_callback(_discard_pending)
+        captures.append(PlotCapture(number, key, figure_dpi, size, downsampled, future=future))
+    return captures
+
+
+def _render_and_store(figure, dpi, key):
+    png = _render(figure, dpi)
+    if key:
+        _store_render(key, png)
+    return png
+
+
+def _discard_pending(future):
+    with _cache_lock:
+        _pending.discard(future)
+
+
+def emit_plots(captures, callback, timeout=30):
+    """
+    Send each capture as a "plot" callback; render errors become "error" lines
+
+    Callbacks that take binary records (a MessageChannel) get the raw PNG
+    with the metadata alongside instead of base64 JSON text.
+    """
+    binary = getattr(callback, "accepts_bytes", False)
+    for capture in captures:
+        try:
+            if binary:
+                callback.send("plot", capture.png(timeout), capture.metadata())
+            else:
+                callback(capture.payload(timeout), "plot")
+        except Exception as e:
+            callback(f"PlotError: figure {capture.number} could not be rendered: "
+                     f"{type(e).__name__}: {e}", "error")
+
+
+def clear_render_cache():
+    with _cache_lock:
+        _render_cache.clear()
@@ -0,0 +1,315 @@
+"""
+PyGenius AI Worker Pool - warm, pre-forked processes for execute_code
+"""
+import os
+import sys
+import queue
+import threading
+import multiprocessing
+
+# Modules every worker imports once at startup
+DEFAULT_PRELOAD = ("numpy", "matplotlib.pyplot", "pandas")
+
+
+def _current_rss_kb():
+    """Resident set size of the current process in KiB (0 if unknown)"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS reports bytes, Linux reports KiB
+        return peak // 1024 if sys.platform == "darwin" else peak
+    except (ImportError, OSError):
+        return 0
+
+
+class _PipeCallback:
+    """
+    Forwards execute_code callbacks from a child process over a pipe
+
+    Output may be flushed from a background thread while the main thread
+    sends, so every message for the pipe goes through send(), which holds
+    a lock shared by all users of the connection.
+    """
+
+    def __init__(self, conn, job_id, lock=None):
+        self.conn = conn
+        self.job_id = job_id
+        self.lock = lock if lock is not None else threading.Lock()
+
+    def send(self, kind, *payload):
+        with self.lock:
+            self.conn.send((kind, self.job_id) + payload)
+
+    def __call__(self, text, line_type):
+        self.send("callback", text, line_type)
+
+
+def _worker_main(conn, preload):
+    """Worker loop: import the scientific stack once, then serve jobs"""
+    import importlib
+    for module_name in preload:
+        try:
+            importlib.import_module(module_name)
+        except Exception:
+            pass
+
+    import pygenius_runtime
+
+    send_lock = threading.Lock()
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if job is None:
+            break
+
+        job_id, code, stream = job
+        pipe = _PipeCallback(conn, job_id, send_lock)
+        callback = pipe if stream else None
+        try:
+            result = pygenius_runtime.execute_code(code, callback)
+        except BaseException as e:
+            # SystemExit and friends escape execute_code; report, keep serving
+            result = f"{type(e).__name__}: {e}"
+            if callback:
+                callback(result, "error")
+        pipe.send("result", result, _current_rss_kb())
+
+    conn.close()
+
+
+class _Worker:
+    """Parent-side handle for one worker process"""
+
+    def __init__(self, ctx, preload):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, preload),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.jobs_done = 0
+        self.rss_kb = 0
+
+    def stop(self, timeout=2):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class WorkerPool:
+    """
+    Pool of long-lived worker processes that run execute_code
+
+    Each worker imports the scientific stack once and then serves jobs.
+    Results and the callback stream are identical to calling
+    pygenius_runtime.execute_code directly.
+
+    Args:
+        size: Number of worker processes
+        max_jobs_per_worker: Recycle a worker after this many jobs
+        max_rss_mb: Recycle a worker once its RSS exceeds this many MiB
+        preload: Module names imported by each worker at startup
+    """
+
+    def __init__(self, size=2, max_jobs_per_worker=200, max_rss_mb=512,
+                 preload=DEFAULT_PRELOAD):
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        methods = multiprocessing.get_all_start_methods()
+        self._ctx = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+        self.size = size
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_rss_kb = max_rss_mb * 1024 if max_rss_mb else None
+        self.preload = tuple(preload)
+
+        self._lock = threading.Lock()
+        self._idle = queue.Queue()
+        self._workers = []
+        self._busy = 0
+        self._all_idle = threading.Condition(self._lock)
+        self._accepting = True
+        self._closed = False
+        self._next_job_id = 0
+        self._stats = {"jobs": 0, "recycled": 0, "crashed": 0, "aborted": 0}
+
+        for _ in range(size):
+            self._spawn()
+
+    def _spawn(self):
+        with self._lock:
+            if self._closed:
+                return
+        worker = _Worker(self._ctx, self.preload)
+        with self._lock:
+            # shutdown() may have run while the process was starting
+            closed = self._closed
+            if not closed:
+                self._workers.append(worker)
+        if closed:
+            worker.stop()
+        else:
+            self._idle.put(worker)
+
+    def _retire(self, worker, timeout=2):
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+        worker.stop(timeout)
+
+    def execute_code(self, code, callback=None):
+        """
+        Execute code on an idle worker
+
+        Args:
+            code: Python code string to execute
+            callback: Function called with (line, line_type) for each output
+
+        Returns:
+            Execution result as string
+        """
+        with self._lock:
+            if not self._accepting:
+                raise RuntimeError("WorkerPool is draining or shut down")
+            self._busy += 1
+            self._next_job_id += 1
+            job_id = self._next_job_id
+
+        worker = self._idle.get()
+        try:
+            return self._run_job(worker, job_id, code, callback)
+        finally:
+            with self._lock:
+                self._busy -= 1
+                self._stats["jobs"] += 1
+                if self._busy == 0:
+                    self._all_idle.notify_all()
+
+    def _run_job(self, worker, job_id, code, callback):
+        try:
+            worker.conn.send((job_id, code, callback is not None))
+            while True:
+                message = worker.conn.recv()
+                kind = message[0]
+                if message[1] != job_id:
+                    # Late output of an earlier job (e.g. printed by a thread
+                    # it left running); it must not reach this job's callback
+                    continue
+                if kind == "callback":
+                    callback(message[2], message[3])
+                elif kind == "result":
+                    result, worker.rss_kb = message[2], message[3]
+                    break
+        except (EOFError, OSError) as e:
+            # Worker died mid-job (segfault, os._exit, OOM killer...)
+            with self._lock:
+                self._stats["crashed"] += 1
+            self._retire(worker)
+            self._spawn()
+            reason = str(e) or type(e).__name__
+            error_msg = f"WorkerCrashed: execution process exited unexpectedly ({reason})"
+            if callback:
+                callback(error_msg, "error")
+            return error_msg
+        except BaseException:
+            # The host callback raised or we were interrupted mid-job: the
+            # worker is still running and its pipe is out of sync, so it
+            # cannot be reused
+            with self._lock:
+                self._stats["aborted"] += 1
+            self._retire(worker, timeout=0)
+            self._spawn()
+            raise
+
+        worker.jobs_done += 1
+        too_old = self.max_jobs_per_worker and worker.jobs_done >= self.max_jobs_per_worker
+        too_big = self.max_rss_kb and worker.rss_kb > self.max_rss_kb
+        if too_old or too_big:
+            with self._lock:
+                self._stats["recycled"] += 1
+            self._retire(worker)
+            self._spawn()
+        else:
+            self._idle.put(worker)
+        return result
+
+    def drain(self, timeout=None):
+        """
+        Stop accepting new jobs and wait for in-flight jobs to finish
+
+        Returns:
+            True if the pool went idle within timeout
+        """
+        with self._lock:
+            self._accepting = False
+            return self._all_idle.wait_for(lambda: self._busy == 0, timeout)
+
+    def shutdown(self, timeout=None):
+        """Drain the pool and stop every worker process"""
+        self.drain(timeout)
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.stop()
+
+    def stats(self):
+        """Pool counters and per-worker state"""
+        with self._lock:
+            return {
+                "size": self.size,
+                "busy": self._busy,
+                "accepting": self._accepting,
+                "jobs": self._stats["jobs"],
+                "recycled": self._stats["recycled"],
+                "crashed": self._stats["crashed"],
+                "aborted": self._stats["aborted"],
+                "workers": [
+                    {"pid": w.process.pid, "jobs_done": w.jobs_done, "rss_kb": w.rss_kb}
+                    for w in self._workers
+                ],
+            }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_pool(**kwargs):
+    """Return the shared WorkerPool, creating it on first use"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = WorkerPool(**kwargs)
+        return _default_pool
+
+
+def shutdown_pool(timeout=None):
+    """Drain and stop the shared WorkerPool if one was created"""
+    global _default_pool
+    with _default_pool_lock:
+        pool, _default_pool = _default_pool, None
+    if pool is not None:
+        pool.shutdown(timeout)
@@ -0,0 +1,227 @@
+"""
+PyGenius AI Preview - paged windows into large arrays, DataFrames and buffers
+"""
+import weakref
+import threading
+
+from pygenius_inspect import PREVIEW_CHARS, _is_ndarray, _is_dataframe, _is_series
+
+# Upper bounds for one requested window
+MAX_ROWS = 500
+MAX_COLS = 100
+BYTES_PER_ROW = 16
+
+# Rows per chunk when computing summary statistics, so a pass over a huge
+# column only ever holds one chunk's temporaries
+STATS_CHUNK_ROWS = 1 << 16
+
+_stats_cache = {}
+_stats_lock = threading.Lock()
+
+
+def _clamp(start, count, total, limit):
+    start = max(0, min(int(start), total))
+    stop = min(total, start + max(0, min(int(count), limit)))
+    return start, stop
+
+
+def _cell(value):
+    """Short display text for one element"""
+    if isinstance(value, float):
+        return f"{value:.6g}"
+    text = value if isinstance(value, str) else repr(value)
+    if len(text) > PREVIEW_CHARS:
+        text = text[:PREVIEW_CHARS - 3] + "..."
+    return text
+
+
+def _numeric_stats(chunks):
+    """
+    count/missing/min/max/mean/std accumulated over array chunks
+
+    Each chunk contributes its own mean and sum of squared deviations (M2),
+    merged with Chan et al.'s pairwise update, so large-magnitude values
+    (timestamps, IDs) don't lose the variance to cancellation.
+    """
+    import numpy as np
+    count = missing = 0
+    low = high = None
+    mean = m2 = 0.0
+    for chunk in chunks:
+        if chunk.dtype.kind == "f":
+            nan = np.isnan(chunk)
+            missing += int(nan.sum())
+            if nan.any():
+                chunk = chunk[~nan]
+        if not chunk.size:
+            continue
+        chunk_low, chunk_high = chunk.min(), chunk.max()
+        low = chunk_low if low is None else min(low, chunk_low)
+        high = chunk_high if high is None else max(high, chunk_high)
+        values = chunk.astype(np.float64, copy=False)
+        chunk_count = values.size
+        chunk_mean = float(values.mean())
+        chunk_m2 = float(np.square(values - chunk_mean).sum())
+        merged = count + chunk_count
+        delta = chunk_mean - mean
+        mean += delta * chunk_count / merged
+        m2 += chunk_m2 + delta * delta * count * chunk_count / merged
+        count = merged
+    stats = {"count": count, "missing": missing}
+    if count:
+        stats.update(min=low.item(), max=high.item(), mean=mean,
+                     std=(m2 / count) ** 0.5)
+    return stats
+
+
+def _array_chunks(array):
+    """Views of an array in chunks along its first axis"""
+    for start in range(0, len(array), STATS_CHUNK_ROWS):
+        yield array[start:start + STATS_CHUNK_ROWS]
+
+
+def _series_stats(series):
+    kind = series.dtype.kind
+    if kind in "iufb":
+        return _numeric_stats(
+            series.iloc[start:start + STATS_CHUNK_ROWS].to_numpy()
+            for start in range(0, len(series), STATS_CHUNK_ROWS))
+    count = int(series.count())
+    return {"count": count, "missing": len(series) - count}
+
+
+def _cached_stats(value, key, generation, compute):
+    """
+    Summary statistics cached per object and key until the namespace
+    generation changes (i.e. until user code may have mutated the object)
+    """
+    cache_key = (id(value), key)
+    with _stats_lock:
+        entry = _stats_cache.get(cache_key)
+        if entry is not None and entry[0]() is value and entry[1] == generation:
+            return entry[2]
+    stats = compute()
+    try:
+        ref = weakref.ref(value, lambda _, k=cache_key: _stats_cache.pop(k, None))
+    except TypeError:
+        return stats
+    with _stats_lock:
+        _stats_cache[cache_key] = (ref, generation, stats)
+    return stats
+
+
+def _array_stats(array):
+    if array.dtype.kind not in "iufb" or array.ndim == 0:
+        return {"count": int(array.size), "missing": 0}
+    return _numeric_stats(_array_chunks(array))
+
+
+def _preview_array(array, rows, cols, generation):
+    if array.ndim == 0:
+        array = array.reshape(1)
+    row_start, row_stop = _clamp(*rows, array.shape[0], MAX_ROWS)
+    if array.ndim == 1:
+        col_start, col_stop = 0, 1
+        window = array[row_start:row_stop]
+        values = [[_cell(v)] for v in window.tolist()]
+    else:
+        col_start, col_stop = _clamp(*cols, array.shape[1], MAX_COLS)
+        # Basic slicing returns a view; only the window is converted
+        window = array[row_start:row_stop, col_start:col_stop]
+        if array.ndim == 2:
+            values = [[_cell(v) for v in row] for row in window.tolist()]
+        else:
+            values = [[f"array{tuple(cell.shape)}" for cell in row] for row in window]
+    return {
+        "type": type(array).__name__,
+        "shape": list(array.shape),
+        "dtype": str(array.dtype),
+        "rows": [row_start, row_stop],
+        "cols": [col_start, col_stop],
+        "index": list(range(row_start, row_stop)),
+        "columns": list(range(col_start, col_stop)),
+        "values": values,
+        "stats": _cached_stats(array, None, generation, lambda: _array_stats(array)),
+    }
+
+
+def _preview_frame(frame, rows, cols, generation):
+    is_series = _is_series(frame)
+    total_cols = 1 if is_series else frame.shape[1]
+    row_start, row_stop = _clamp(*rows, len(frame), MAX_ROWS)
+    col_start, col_stop = _clamp(*cols, total_cols, MAX_COLS)
+
+    columns = []
+    stats = []
+    for position in range(col_start, col_stop):
+        # One column at a time: slicing a numpy-backed column is a view, so a
+        # mixed-dtype frame is never consolidated into one big copy
+        series = frame if is_series else frame.iloc[:, position]
+        columns.append(series.iloc[row_start:row_stop].tolist())
+        stats.append(dict(
+            _cached_stats(frame, position, generation, lambda s=series: _series_stats(s)),
+            dtype=str(series.dtype)))
+
+    labels = [frame.name] if is_series else frame.columns[col_start:col_stop].tolist()
+    return {
+        "type": type(frame).__name__,
+        "shape": list(frame.shape),
+        "dtype": stats[0]["dtype"] if is_series and stats else None,
+        "rows": [row_start, row_stop],
+        "cols": [col_start, col_stop],
+        "index": [_cell(label) for label in frame.index[row_start:row_stop].tolist()],
+        "columns": [_cell(label) for label in labels],
+        "values": [[_cell(column[i]) for column in columns]
+                   for i in range(row_stop - row_start)],
+        "stats": stats,
+    }
+
+
+def _preview_bytes(value, rows):
+    view = memoryview(value).cast("B")
+    total_rows = -(-len(view) // BYTES_PER_ROW)
+    row_start, row_stop = _clamp(*rows, total_rows, MAX_ROWS)
+    values = []
+    for row in range(row_start, row_stop):
+        # memoryview slices share the buffer; only 16 bytes are read per row
+        chunk = view[row * BYTES_PER_ROW:(row + 1) * BYTES_PER_ROW]
+        values.append([chunk.hex(" "),
+                       "".join(chr(b) if 32 <= b < 127 else "." for b in chunk)])
+    return {
+        "type": type(value).__name__,
+        "shape": [len(view)],
+        "dtype": "uint8",
+        "rows": [row_start, row_stop],
+        "cols": [0, 2],
+        "index": [row * BYTES_PER_ROW for row in range(row_start, row_stop)],
+        "columns": ["hex", "ascii"],
+        "values": values,
+        "stats": {"count": len(view), "missing": 0},
+    }
+
+
+def preview(value, rows=(0, 50), cols=(0, 20), generation=0):
+    """
+    One window of a large value, for paging through it in the console
+
+    Args:
+        value: ndarray, DataFrame, Series or bytes-like object
+        rows: (start, count) of rows (first axis; 16-byte lines for buffers)
+        cols: (start, count) of columns (second axis)
+        generation: Stats stay cached while this value is unchanged
+
+    Returns:
+        Dict with type, shape, dtype, the clamped "rows"/"cols" ranges,
+        "index" and "columns" labels, "values" (rows of display strings)
+        and summary "stats" (one dict, or one per column for pandas)
+
+    Raises:
+        TypeError: value is not a previewable type
+    """
+    if _is_ndarray(value):
+        return _preview_array(value, rows, cols, generation)
+    if _is_dataframe(value) or _is_series(value):
+        return _preview_frame(value, rows, cols, generation)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return _preview_bytes(value, rows)
+    raise TypeError(f"Cannot preview {type(value).__name__}")
@@ -0,0 +1,237 @@
+"""
+PyGenius AI Profiling - low-overhead sampling profiler for user code
+"""
+import sys
+import time
+import threading
+import tracemalloc
+from collections import Counter
+
+from pygenius_runtime import USER_FILENAME
+
+DEFAULT_INTERVAL = 0.005
+DEFAULT_TOP_N = 10
+
+# Traceback depth recorded per allocation so library allocations can be
+# attributed back to the user line that triggered them
+TRACE_FRAMES = 16
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    if code.co_filename == USER_FILENAME:
+        return code.co_name
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{code.co_name}"
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler that samples one thread's stack on a timer
+
+    Only frames of user code (filename USER_FILENAME) are kept, plus the first
+    library frame each time user code calls out, so time spent inside numpy
+    or pandas shows up as a single boundary frame instead of its internals.
+    The frame that called start() and everything outside it are ignored.
+
+    Args:
+        interval: Seconds between samples
+        thread_id: Thread to sample (defaults to the thread calling start())
+    """
+
+    def __init__(self, interval=DEFAULT_INTERVAL, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.root_frame = None
+        self.stacks = Counter()
+        self.lines = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._started = 0.0
+        self._elapsed = 0.0
+
+    def start(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+            self.root_frame = sys._getframe(1)
+        self._stop.clear()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="pygenius-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._elapsed = time.perf_counter() - self._started
+        self.root_frame = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _run(self):
+        wait = self._stop.wait
+        current_frames = sys._current_frames
+        while not wait(self.interval):
+            frame = current_frames().get(self.thread_id)
+            if frame is not None:
+                self._record(frame)
+
+    def _record(self, frame):
+        # Walk leaf -> root, then keep user frames and call-out boundaries
+        chain = []
+        root = self.root_frame
+        while frame is not None and frame is not root:
+            chain.append(frame)
+            frame = frame.f_back
+        chain.reverse()
+
+        stack = []
+        leaf_line = None
+        in_user = False
+        for f in chain:
+            if f.f_code.co_filename == USER_FILENAME:
+                in_user = True
+                stack.append(f.f_code.co_name)
+                leaf_line = f.f_lineno
+            elif in_user:
+                stack.append(_frame_label(f))
+                in_user = False
+        if not stack:
+            return
+        self.samples += 1
+        self.stacks[";".join(stack)] += 1
+        if leaf_line is not None:
+            self.lines[leaf_line] += 1
+
+    def collapsed(self):
+        """Collapsed-stack text (one 'a;b;c count' line per stack) for flame graphs"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def hot_lines(self, source=None, top_n=DEFAULT_TOP_N):
+        """Top-N user code lines by sample count"""
+        source_lines = source.splitlines() if source else []
+        total = self.samples or 1
+        table = []
+        for line, count in self.lines.most_common(top_n):
+            text = source_lines[line - 1].strip() if 0 < line <= len(source_lines) else ""
+            table.append({
+                "line": line,
+                "samples": count,
+                "percent": round(100.0 * count / total, 1),
+                "source": text,
+            })
+        return table
+
+    def report(self, source=None, top_n=DEFAULT_TOP_N):
+        return {
+            "mode": "sample",
+            "interval": self.interval,
+            "duration": self._elapsed,
+            "samples": self.samples,
+            "collapsed": self.collapsed(),
+            "hot_lines": self.hot_lines(source, top_n),
+        }
+
+
+class MemoryTracer:
+    """
+    tracemalloc-based memory report for one execution
+
+    Reports peak traced memory during the run, the top allocation sites by
+    line of user code, and the net growth of each namespace variable.
+
+    Args:
+        top_n: Number of allocation sites reported
+        frames: Traceback depth stored per allocation
+    """
+
+    def __init__(self, top_n=DEFAULT_TOP_N, frames=TRACE_FRAMES):
+        self.top_n = top_n
+        self.frames = frames
+        self._was_tracing = False
+        self._start_bytes = 0
+        self._baseline = {}
+        self._snapshot = None
+        self.current_bytes = 0
+        self.peak_bytes = 0
+
+    @staticmethod
+    def _sizes(namespace, skip):
+        from pygenius_inspect import deep_estimate_bytes, _SKIP_TYPES
+        return {
+            name: (type(value).__name__, deep_estimate_bytes(value) or 0)
+            for name, value in list(namespace.items())
+            if not name.startswith("_") and name not in skip
+            and not isinstance(value, _SKIP_TYPES)
+        }
+
+    def start(self, namespace=None, skip=()):
+        self._baseline = self._sizes(namespace or {}, skip)
+        self._was_tracing = tracemalloc.is_tracing()
+        if not self._was_tracing:
+            tracemalloc.start(self.frames)
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        self._start_bytes = tracemalloc.get_traced_memory()[0]
+        return self
+
+    def stop(self, namespace=None, skip=()):
+        current, peak = tracemalloc.get_traced_memory()
+        self._snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(True, USER_FILENAME, all_frames=True)])
+        if not self._was_tracing:
+            tracemalloc.stop()
+        self.current_bytes = current - self._start_bytes
+        self.peak_bytes = max(0, peak - self._start_bytes)
+        self._final = self._sizes(namespace or {}, skip)
+
+    def top_sites(self, source=None):
+        """Top allocation sites, keyed by the innermost user-code line"""
+        by_line = Counter()
+        blocks = Counter()
+        for stat in self._snapshot.statistics("traceback"):
+            line = None
+            for frame in stat.traceback:
+                if frame.filename == USER_FILENAME:
+                    line = frame.lineno
+            if line is not None:
+                by_line[line] += stat.size
+                blocks[line] += stat.count
+        source_lines = source.splitlines() if source else []
+        return [
+            {
+                "line": line,
+                "bytes": size,
+                "blocks": blocks[line],
+                "source": source_lines[line - 1].strip() if 0 < line <= len(source_lines) else "",
+            }
+            for line, size in by_line.most_common(self.top_n)
+        ]
+
+    def variable_growth(self):
+        """Net estimated growth per variable, largest first"""
+        growth = []
+        for name, (type_name, size) in self._final.items():
+            before = self._baseline.get(name, (None, 0))[1]
+            growth.append({"name": name, "type": type_name, "bytes": size, "growth": size - before})
+        for name, (type_name, size) in self._baseline.items():
+            if name not in self._final:
+                growth.append({"name": name, "type": type_name, "bytes": 0, "growth": -size})
+        growth.sort(key=lambda item: item["growth"], reverse=True)
+        return growth
+
+    def report(self, source=None):
+        return {
+            "mode": "tracemalloc",
+            "peak_bytes": self.peak_bytes,
+            "net_bytes": self.current_bytes,
+            "top_sites": self.top_sites(source),
+            "variables": self.variable_growth(),
+        }
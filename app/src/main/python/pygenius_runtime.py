@@ -1,124 +1,1080 @@
 """
 PyGenius AI Runtime - Python execution environment with AI hooks
 """
+import os
 import sys
-import io
-import traceback
-import json
-import subprocess
-import pkg_resources
-from contextlib import redirect_stdout, redirect_stderr
+import time
+import types
+import atexit
+import marshal
+# Low-level locks: importing threading (and with it functools, warnings...)
+# is left to the code paths that need threads
+import _thread
+from collections import OrderedDict, deque
+
+from pygenius_metrics import registry as _metrics, instrumented as _instrumented
+from pygenius_tracing import tracer as _tracer
+
+# Everything heavier (json, traceback, subprocess, hashlib, importlib...) is
+# imported inside the functions that use it, keeping this module's import
+# off the app's cold-start path; see benchmarks/bench_import.py
+
+# Runtime metrics; every public function also records calls and latency
+_compile_seconds = _metrics.histogram(
+    "pygenius_compile_duration_seconds", "Time to compile user code on bytecode cache misses")
+_exec_seconds = _metrics.histogram(
+    "pygenius_exec_duration_seconds", "Wall time of user code inside exec()")
+_executions_total = _metrics.counter(
+    "pygenius_executions_total", "Executions by outcome", ("status",))
+_execution_errors = _metrics.counter(
+    "pygenius_execution_errors_total", "Exceptions raised by user code, by type", ("type",))
+_callbacks_total = _metrics.counter(
+    "pygenius_callbacks_total", "Callbacks fired to the host, by line type", ("line_type",))
+_execution_ok = _executions_total.labels("ok")
+_execution_error = _executions_total.labels("error")
+_execution_syntax_error = _executions_total.labels("syntax_error")
+
+# Filename user code is compiled under; profilers match frames on it, so it
+# must differ from "<string>", which stdlib-generated code (namedtuple,
+# dataclass methods) also uses
+USER_FILENAME = '<pygenius>'
+
+# Convenience names injected into every execution namespace
+LAZY_MODULES = {
+    'np': 'numpy',
+    'plt': 'matplotlib.pyplot',
+    'pd': 'pandas',
+}
+
+# Number of runs in which each lazy name was actually imported
+_lazy_import_counts = {alias: 0 for alias in LAZY_MODULES}
+_module_available = {}
+
+# Namespace of the most recent execution, kept for variable drill-down
+_last_namespace = {}
+
+# Structured reports (profile, memory...) of the most recent execution
+_last_reports = {}
+
+# Bumped per execution; cached variable statistics are only valid within one
+_execution_count = 0
+
+
+class _LazyModule(types.ModuleType):
+    """Module proxy that imports the real module on first attribute access"""
+    
+    def __init__(self, alias, module_name, namespace):
+        super().__init__(module_name)
+        self.__dict__['_pygenius_alias'] = alias
+        self.__dict__['_pygenius_namespace'] = namespace
+        
+    def _resolve(self):
+        import importlib
+        alias = self.__dict__['_pygenius_alias']
+        module = importlib.import_module(self.__name__)
+        _lazy_import_counts[alias] += 1
+        # Swap the proxy out so later lookups hit the real module directly
+        namespace = self.__dict__['_pygenius_namespace']
+        if namespace.get(alias) is self:
+            namespace[alias] = module
+        self.__dict__['_pygenius_module'] = module
+        return module
+        
+    def __getattr__(self, attr):
+        module = self.__dict__.get('_pygenius_module') or self._resolve()
+        return getattr(module, attr)
+        
+    def __dir__(self):
+        module = self.__dict__.get('_pygenius_module') or self._resolve()
+        return dir(module)
+        
+    def __repr__(self):
+        return f"<lazy module '{self.__name__}'>"
+
+
+def _is_available(module_name):
+    """Check (once) whether a module can be imported, without importing it"""
+    top_level = module_name.partition('.')[0]
+    if top_level not in _module_available:
+        import importlib.util
+        try:
+            _module_available[top_level] = importlib.util.find_spec(top_level) is not None
+        except (ImportError, ValueError):
+            _module_available[top_level] = False
+    return _module_available[top_level]
+
+
+@_instrumented
+def get_lazy_import_stats():
+    """Return how many runs triggered the import behind each lazy name"""
+    return dict(_lazy_import_counts)
+
+def _cache_dir():
+    """Directory for on-disk runtime caches (PYGENIUS_CACHE_DIR overrides)"""
+    path = os.environ.get('PYGENIUS_CACHE_DIR') or os.path.join(
+        os.path.expanduser('~'), '.cache', 'pygenius')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class CodeCache:
+    """
+    LRU cache of compiled code objects keyed by a hash of source and flags
+    
+    Optionally persisted to disk in marshal format. The file header carries
+    the interpreter's bytecode magic number and a format version, so a stale
+    file from another Python build is ignored rather than loaded.
+    """
+    
+    FILE_TAG = b'PGCC'
+    FORMAT_VERSION = 1
+    
+    def __init__(self, max_entries=256, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self._entries = OrderedDict()
+        self._lock = _thread.allocate_lock()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+    @staticmethod
+    def key(source, filename, mode, flags):
+        import hashlib
+        header = f"{mode}\0{filename}\0{flags}\0".encode()
+        return hashlib.sha256(header + source.encode('utf-8', 'surrogatepass')).hexdigest()
+        
+    def compile(self, source, filename='<string>', mode='exec', flags=0):
+        """Drop-in replacement for compile() that reuses cached code objects"""
+        key = self.key(source, filename, mode, flags)
+        with self._lock:
+            code_obj = self._entries.get(key)
+            if code_obj is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return code_obj
+            self.misses += 1
+            
+        # SyntaxError propagates and is never cached
+        start = time.perf_counter()
+        code_obj = compile(source, filename, mode, flags)
+        _compile_seconds.observe(time.perf_counter() - start)
+        
+        with self._lock:
+            self._entries[key] = code_obj
+            self._dirty = True
+            self._trim()
+        return code_obj
+        
+    def _trim(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+            
+    def resize(self, max_entries):
+        with self._lock:
+            self.max_entries = max_entries
+            self._trim()
+            
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+            
+    def _header(self):
+        import importlib.util
+        return (self.FILE_TAG + importlib.util.MAGIC_NUMBER
+                + self.FORMAT_VERSION.to_bytes(2, 'little'))
+        
+    def load(self):
+        """Load entries from self.path; returns number of entries loaded"""
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        header = self._header()
+        try:
+            with open(self.path, 'rb') as f:
+                if f.read(len(header)) != header:
+                    return 0
+                entries = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return 0
+        with self._lock:
+            for key, code_obj in entries.items():
+                if key not in self._entries:
+                    self._entries[key] = code_obj
+            self._trim()
+            return len(self._entries)
+            
+    def save(self):
+        """Write entries to self.path atomically if anything changed"""
+        if not self.path:
+            return False
+        with self._lock:
+            if not self._dirty:
+                return False
+            data = marshal.dumps(dict(self._entries))
+            self._dirty = False
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(self._header())
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            return False
+        return True
+        
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'path': self.path,
+            }
+
+
+code_cache = CodeCache()
+
+_code_cache_gauge = _metrics.gauge(
+    "pygenius_code_cache", "Bytecode cache entries and lookup counts", ("value",))
+_code_cache_gauge.labels("entries").function = lambda: len(code_cache._entries)
+_code_cache_gauge.labels("hits").function = lambda: code_cache.hits
+_code_cache_gauge.labels("misses").function = lambda: code_cache.misses
+
+
+@_instrumented
+def configure_code_cache(max_entries=None, persist=None, path=None):
+    """
+    Configure the shared bytecode cache
+    
+    Args:
+        max_entries: New LRU size bound
+        persist: True to load/save the cache on disk, False to stop persisting
+        path: Cache file location (defaults to the runtime cache dir)
+    """
+    if max_entries is not None:
+        code_cache.resize(max_entries)
+    if persist:
+        code_cache.path = path or os.path.join(_cache_dir(), 'code_cache.bin')
+        code_cache.load()
+        atexit.unregister(code_cache.save)
+        atexit.register(code_cache.save)
+    elif persist is False:
+        code_cache.save()
+        code_cache.path = None
+        atexit.unregister(code_cache.save)
+    return code_cache.stats()
+
+
+@_instrumented
+def get_code_cache_stats():
+    """Return hit/miss/eviction counters of the bytecode cache"""
+    return code_cache.stats()
+
+
+_result_cache = None
+
+
+def _get_result_cache():
+    global _result_cache
+    if _result_cache is None:
+        from pygenius_memo import ResultCache
+        _result_cache = ResultCache()
+    return _result_cache
+
+
+@_instrumented
+def configure_result_cache(max_entries=None, clear=False):
+    """
+    Configure the opt-in result cache used by execute_code(cache=True)
+    
+    Args:
+        max_entries: New LRU size bound
+        clear: Drop all cached results
+    """
+    result_cache = _get_result_cache()
+    if max_entries is not None:
+        result_cache.resize(max_entries)
+    if clear:
+        result_cache.clear()
+    return result_cache.stats()
+
+
+@_instrumented
+def get_result_cache_stats():
+    """Return hit/miss/eviction counters of the result cache"""
+    return _get_result_cache().stats()
+
+
+@_instrumented
+def is_cacheable(code):
+    """
+    Check whether execute_code(cache=True) may reuse results for code
+    
+    Returns:
+        Dict with "cacheable" and the "reasons" it is not (randomness,
+        time, I/O or input use, or a "# pygenius: no-cache" comment)
+    """
+    from pygenius_memo import find_nondeterminism
+    reasons = find_nondeterminism(code)
+    return {'cacheable': not reasons, 'reasons': reasons}
+
+
+@_instrumented
+def create_output_store(memory_limit=1 << 20):
+    """Create an OutputStore to pass to execute_code for paged output"""
+    from pygenius_output import OutputStore
+    return OutputStore(memory_limit=memory_limit)
+
+
+# Output capture limits used by execute_code
+OUTPUT_HEAD_LINES = 1000
+OUTPUT_TAIL_LINES = 1000
+
+
+class _DeadlineFlusher:
+    """
+    One background thread that flushes coalesced captures whose pending
+    text has waited out its deadline, so output printed before a quiet
+    stretch (sleep, long computation) is still delivered promptly
+    """
+    
+    def __init__(self):
+        self._reset()
+        
+    def _reset(self):
+        # Also run in forked children (worker pool), which inherit the
+        # state but not the thread
+        self._cond = None
+        self._due = {}
+        self._flushing = []
+        self._start_lock = _thread.allocate_lock()
+        
+    def arm(self, capture, deadline):
+        if self._cond is None:
+            with self._start_lock:
+                if self._cond is None:
+                    import threading
+                    cond = threading.Condition()
+                    threading.Thread(target=self._run, args=(cond,),
+                                     name="pygenius-output-flush", daemon=True).start()
+                    self._cond = cond
+        with self._cond:
+            self._due[capture] = deadline
+            self._cond.notify()
+            
+    def cancel(self, capture):
+        cond = self._cond
+        if cond is not None:
+            with cond:
+                self._due.pop(capture, None)
+                
+    def flush_all(self):
+        """
+        Deliver everything armed now and wait for flushes already running,
+        for callers that are about to stop listening to the callback
+        """
+        cond = self._cond
+        if cond is None:
+            return
+        with cond:
+            captures = list(self._due) + self._flushing
+        for capture in captures:
+            capture.finish()
+            
+    def _run(self, cond):
+        with cond:
+            while True:
+                if not self._due:
+                    cond.wait()
+                    continue
+                now = time.monotonic()
+                due = [capture for capture, deadline in self._due.items() if deadline <= now]
+                if not due:
+                    cond.wait(min(self._due.values()) - now)
+                    continue
+                for capture in due:
+                    del self._due[capture]
+                self._flushing = due
+                cond.release()
+                try:
+                    for capture in due:
+                        try:
+                            capture._flush_due()
+                        except Exception:
+                            # A failing host callback must not stop the flusher
+                            pass
+                finally:
+                    cond.acquire()
+                    self._flushing = []
+
+
+_deadline_flusher = _DeadlineFlusher()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_deadline_flusher._reset)
+
 
 class PyGeniusOutput:
-    """Custom stdout/stderr capture with AI analysis hooks"""
+    """
+    Custom stdout/stderr capture with AI analysis hooks
     
-    def __init__(self, callback=None):
+    By default every write is stored and forwarded to the callback. With
+    coalesce=True writes are batched into chunks that are flushed once they
+    reach chunk_size characters or have waited flush_interval seconds (from a
+    background thread when no further write comes), and callbacks are
+    throttled to max_callbacks_per_sec while output keeps flooding in. Setting
+    head_lines/tail_lines bounds the stored text to the first and last lines
+    with an "N lines elided" marker in between. If a store (an OutputStore)
+    is given, the complete output is also appended there for paging.
+    """
+    
+    def __init__(self, callback=None, coalesce=False, chunk_size=8192,
+                 flush_interval=0.05, max_callbacks_per_sec=20,
+                 max_pending=1 << 20, head_lines=None, tail_lines=None,
+                 line_type="output", store=None):
         self.callback = callback
+        self.store = store
+        self.line_type = line_type
         self.output_buffer = []
         
+        # Batching state
+        self.coalesce = coalesce
+        self.chunk_size = chunk_size
+        self.flush_interval = flush_interval
+        self.max_callbacks_per_sec = max_callbacks_per_sec
+        self.max_pending = max_pending
+        # Writes append without locking (deque appends are atomic); emitting
+        # holds the lock so the deadline flusher and the writer never
+        # deliver out of order. Reentrant: a callback may print
+        self._pending = deque()
+        self._pending_size = 0
+        self._lock = _thread.RLock()
+        self._armed = False
+        self._last_flush = 0.0
+        self._window_start = 0.0
+        self._window_callbacks = 0
+        self.callbacks_fired = 0
+        self._callback_metric = _callbacks_total.labels(line_type)
+        # Sibling capture (stdout <-> stderr) whose pending text is flushed
+        # before this one is written to, to keep the two streams in order
+        self.linked = None
+        
+        # Bounded head/tail window
+        self.bounded = head_lines is not None or tail_lines is not None
+        self.head_lines = head_lines or 0
+        self._tail = deque(maxlen=tail_lines or 0)
+        # Unterminated last line, kept as pieces and capped at chunk_size
+        self._partial = []
+        self._partial_size = 0
+        self.elided_lines = 0
+        
     def write(self, text):
-        if text.strip():
+        if not text:
+            return 0
+        if self.linked is not None:
+            self.linked.finish()
+        if self.store is not None:
+            self.store.write(text)
+        if self.bounded:
+            self._store(text)
+        else:
             self.output_buffer.append(text)
-            if self.callback:
-                self.callback(text, "output")
+            
+        if self.callback:
+            if not self.coalesce:
+                self._fire(text)
+            else:
+                self._pending.append(text)
+                self._pending_size += len(text)
+                now = time.monotonic()
+                if (self._pending_size >= self.chunk_size
+                        or now - self._last_flush >= self.flush_interval):
+                    self._emit(now)
+                if not self._armed and self._pending:
+                    self._armed = True
+                    _deadline_flusher.arm(self, self._deadline(now))
+        return len(text)
+        
+    def _deadline(self, now):
+        """When pending text is due; a throttled window delays it further"""
+        deadline = now + self.flush_interval
+        if self._window_callbacks >= self.max_callbacks_per_sec:
+            deadline = max(deadline, self._window_start + 1.0)
+        return deadline
+        
+    def _flush_due(self):
+        """Called by the deadline flusher"""
+        # Disarm before taking the text: a write racing with this either
+        # lands in this chunk or sees _armed unset and re-arms
+        self._armed = False
+        now = time.monotonic()
+        self._emit(now)
+        if self._pending and not self._armed:
+            self._armed = True
+            _deadline_flusher.arm(self, self._deadline(now))
+        
+    def _store(self, text):
+        self._partial.append(text)
+        self._partial_size += len(text)
+        if "\n" not in text and self._partial_size < self.chunk_size:
+            return
+        lines = "".join(self._partial).split("\n")
+        rest = lines.pop()
+        size = self.chunk_size
+        for line in lines:
+            # Lines longer than a chunk are stored as chunk-sized pieces
+            pieces = [line[i:i + size] for i in range(0, len(line), size)] or [""]
+            pieces[-1] += "\n"
+            for piece in pieces:
+                self._keep(piece)
+        full = len(rest) - len(rest) % size
+        for i in range(0, full, size):
+            self._keep(rest[i:i + size])
+        rest = rest[full:]
+        self._partial = [rest] if rest else []
+        self._partial_size = len(rest)
+        
+    def _keep(self, line):
+        if len(self.output_buffer) < self.head_lines:
+            self.output_buffer.append(line)
+        else:
+            if len(self._tail) == self._tail.maxlen:
+                self.elided_lines += 1
+            self._tail.append(line)
                 
+    def _emit(self, now, force=False):
+        if not self._pending:
+            return
+        with self._lock:
+            if not force:
+                # Throttle callbacks under print floods; pending text keeps
+                # accumulating into bigger chunks until the window reopens
+                if now - self._window_start >= 1.0:
+                    self._window_start = now
+                    self._window_callbacks = 0
+                if (self._window_callbacks >= self.max_callbacks_per_sec
+                        and self._pending_size < self.max_pending):
+                    return
+                self._window_callbacks += 1
+            pending = self._pending
+            parts = [pending.popleft() for _ in range(len(pending))]
+            if not parts:
+                return
+            self._pending_size = 0
+            self._last_flush = now
+            self._fire("".join(parts))
+        
+    def _fire(self, text):
+        self.callbacks_fired += 1
+        self._callback_metric.inc()
+        with _tracer.span("callback", line_type=self.line_type, chars=len(text)):
+            self.callback(text, self.line_type)
+        
     def flush(self):
-        pass
+        if self.coalesce and self.callback:
+            self._emit(time.monotonic())
+            
+    def finish(self):
+        """
+        Deliver any pending output regardless of the throttle
+        
+        Waits for a flush running on the deadline flusher, so everything
+        written so far has reached the callback when this returns.
+        """
+        if self.coalesce and self.callback:
+            with self._lock:
+                if self._armed:
+                    _deadline_flusher.cancel(self)
+                    self._armed = False
+                self._emit(time.monotonic(), force=True)
         
     def getvalue(self):
-        return "".join(self.output_buffer)
+        if not self.bounded:
+            return "".join(self.output_buffer)
+        parts = self.output_buffer[:]
+        if self.elided_lines:
+            parts.append(f"... {self.elided_lines} lines elided ...\n")
+        parts.extend(self._tail)
+        parts.extend(self._partial)
+        return "".join(parts)
+
+
+def _emit_report(kind, report, callback):
+    """Keep a structured report for get_last_* and send it as one callback"""
+    _last_reports[kind] = report
+    if callback:
+        import json
+        _callbacks_total.labels(kind).inc()
+        with _tracer.span("callback", line_type=kind):
+            callback(json.dumps(report), kind)
+
+
+def _new_namespace():
+    """Fresh __main__-style namespace with the lazy np/plt/pd names"""
+    namespace = {
+        '__name__': '__main__',
+        '__builtins__': __builtins__,
+    }
+    
+    # Common libraries, imported only if the code actually touches them
+    for alias, module_name in LAZY_MODULES.items():
+        if _is_available(module_name):
+            namespace[alias] = _LazyModule(alias, module_name, namespace)
+    return namespace
 
 
-def execute_code(code, callback=None):
+@_instrumented
+def execute_code(code, callback=None, output_store=None, profile=None,
+                 trace_memory=False, session=None, cache=False):
     """
     Execute Python code with enhanced output capture and AI analysis
     
     Args:
         code: Python code string to execute
         callback: Function called with (line, line_type) for each output
+        output_store: Optional OutputStore receiving the complete output;
+            the returned string only holds a head/tail window of it
+        profile: "sample" to run the sampling profiler; the report is sent
+            as a "profile" callback and kept for get_last_profile()
+        trace_memory: Trace allocations with tracemalloc; the report is sent
+            as a "memory" callback and kept for get_last_memory_report()
+        session: Name of a persistent session whose namespace is reused
+            across executions (see get_session); None for a fresh namespace
+        cache: Reuse the result of an earlier identical run (see
+            configure_result_cache); ignored with session, profile,
+            trace_memory or output_store, and for code that uses randomness,
+            time, I/O or input
         
     Returns:
         Execution result as string
     """
-    # Create isolated namespace
-    namespace = {
-        '__name__': '__main__',
-        '__builtins__': __builtins__,
-    }
-    
-    # Import common libraries
-    try:
-        import numpy as np
-        namespace['np'] = np
-    except ImportError:
-        pass
+    with _tracer.trace("execute_code", session=session, chars=len(code)):
+        if cache and session is None and profile is None and not trace_memory \
+                and output_store is None:
+            global _last_namespace
+            # A replayed run has no namespace to inspect
+            _last_namespace = {}
+            _last_reports.clear()
+            with _tracer.span("result_cache"):
+                return _get_result_cache().run(
+                    code, lambda recorder: _execute(code, _new_namespace(), recorder,
+                                                    None, None, False),
+                    callback)
         
-    try:
-        import matplotlib.pyplot as plt
-        namespace['plt'] = plt
-    except ImportError:
-        pass
+        if session is None:
+            return _execute(code, _new_namespace(), callback, output_store,
+                            profile, trace_memory)
         
-    try:
-        import pandas as pd
-        namespace['pd'] = pd
-    except ImportError:
-        pass
+        kernel = get_session(session)
+        with _tracer.span("session_wait"):
+            kernel.lock.acquire()
+        try:
+            kernel.last_used = time.monotonic()
+            result = _execute(code, kernel.namespace, callback, output_store,
+                              profile, trace_memory)
+            kernel.executions += 1
+            kernel.last_used = time.monotonic()
+            with _tracer.span("memory_limit"):
+                kernel.enforce_memory_limit(callback)
+        finally:
+            kernel.lock.release()
+        return result
+
+
+@_instrumented
+def execute_framed(code, sink, batch_bytes=64 * 1024, flush_interval=0.05, **options):
+    """
+    execute_code for hosts that read the binary message protocol
+    
+    Output, errors, plots and variable snapshots are encoded as typed,
+    length-prefixed records (see pygenius_channel) and handed to
+    sink(batch) in batches, so the host bridge is crossed once per batch
+    instead of once per message. Plot PNGs travel as raw bytes.
+    
+    Args:
+        code: Python code string to execute
+        sink: Function receiving each bytes-like batch
+        batch_bytes: Flush once a batch reaches this size
+        flush_interval: Flush when a record arrives this long after the last flush
+        **options: Passed to execute_code (session, profile, cache...)
+        
+    Returns:
+        Execution result as string; every record has been flushed
+    """
+    from pygenius_channel import MessageChannel
+    with MessageChannel(sink, batch_bytes, flush_interval) as channel:
+        return execute_code(code, channel, **options)
+
+
+def _execute(code, namespace, callback, output_store, profile, trace_memory):
+    """Run code in the given namespace; see execute_code"""
+    global _last_namespace, _execution_count
+    _execution_count += 1
+    _last_reports.clear()
+    
+    profiler = None
+    if profile == "sample":
+        from pygenius_profiling import SamplingProfiler
+        profiler = SamplingProfiler()
+    elif profile is not None:
+        raise ValueError(f"Unknown profile mode: {profile!r}")
+    memory_tracer = None
+    if trace_memory:
+        from pygenius_profiling import MemoryTracer
+        memory_tracer = MemoryTracer()
     
     # Capture output
-    stdout_capture = PyGeniusOutput(callback)
-    stderr_capture = PyGeniusOutput(callback)
+    from contextlib import redirect_stdout, redirect_stderr
+    capture_options = dict(coalesce=True, head_lines=OUTPUT_HEAD_LINES,
+                           tail_lines=OUTPUT_TAIL_LINES, store=output_store)
+    stdout_capture = PyGeniusOutput(callback, **capture_options)
+    stderr_capture = PyGeniusOutput(callback, **capture_options)
+    stdout_capture.linked = stderr_capture
+    stderr_capture.linked = stdout_capture
     
     result_lines = []
+    plots = []
     
     try:
         # Compile the code to check for syntax errors
-        compiled = compile(code, '<string>', 'exec')
+        with _tracer.span("compile"):
+            compiled = code_cache.compile(code, USER_FILENAME, 'exec')
+        
+        # Figures are rendered headless and collected after the run
+        from pygenius_plots import use_agg, wait_idle, capture_figures, emit_plots
+        use_agg()
+        wait_idle()
         
         # Execute with captured output
-        with redirect_stdout(stdout_capture), redirect_stderr(stderr_capture):
-            exec(compiled, namespace)
+        exec_start = time.perf_counter()
+        try:
+            if memory_tracer:
+                memory_tracer.start(namespace, skip=LAZY_MODULES)
+            if profiler:
+                profiler.start()
+            with _tracer.span("exec"), redirect_stdout(stdout_capture), \
+                    redirect_stderr(stderr_capture):
+                exec(compiled, namespace)
+        finally:
+            _exec_seconds.observe(time.perf_counter() - exec_start)
+            if profiler:
+                profiler.stop()
+            if memory_tracer:
+                memory_tracer.stop(namespace, skip=LAZY_MODULES)
+            with _tracer.span("plots_capture"):
+                plots = capture_figures(render=callback is not None)
+            with _tracer.span("output_flush"):
+                stdout_capture.finish()
+                stderr_capture.finish()
+            if profiler:
+                _emit_report("profile", profiler.report(code), callback)
+            if memory_tracer:
+                _emit_report("memory", memory_tracer.report(code), callback)
             
         # Get results
-        stdout_text = stdout_capture.getvalue()
-        stderr_text = stderr_capture.getvalue()
+        stdout_text = stdout_capture.getvalue().rstrip("\n")
+        stderr_text = stderr_capture.getvalue().rstrip("\n")
         
         if stdout_text:
             result_lines.append(stdout_text)
         if stderr_text:
             result_lines.append(f"STDERR: {stderr_text}")
             
-        # AI Analysis - check variable states
+        # AI Analysis - one batched snapshot of variable states
+        _last_namespace = namespace
         if callback:
-            for var_name, var_value in namespace.items():
-                if not var_name.startswith('_') and var_name not in ['np', 'plt', 'pd']:
-                    var_type = type(var_value).__name__
-                    if var_type in ['ndarray', 'DataFrame', 'Series']:
-                        shape_info = f"shape={var_value.shape}" if hasattr(var_value, 'shape') else ""
-                        callback(f"📊 Variable '{var_name}': {var_type} {shape_info}", "progress")
-                    elif var_type in ['list', 'dict', 'set']:
-                        size = len(var_value)
-                        callback(f"📦 Variable '{var_name}': {var_type} with {size} items", "progress")
+            import json
+            with _tracer.span("namespace_snapshot"):
+                snapshot = snapshot_namespace(namespace)
+            if snapshot['variables']:
+                _callbacks_total.labels("variables").inc()
+                with _tracer.span("callback", line_type="variables"):
+                    callback(json.dumps(snapshot), "variables")
+            if plots:
+                _callbacks_total.labels("plot").inc(len(plots))
+                with _tracer.span("plots_emit", count=len(plots)):
+                    emit_plots(plots, callback)
         
+        _execution_ok.inc()
         return "\n".join(result_lines) if result_lines else "Code executed successfully (no output)"
         
     except SyntaxError as e:
+        _execution_syntax_error.inc()
         error_msg = f"SyntaxError: {e.msg} at line {e.lineno}"
         if callback:
-            callback(error_msg, "error")
+            _callbacks_total.labels("error").inc()
+            with _tracer.span("callback", line_type="error"):
+                callback(error_msg, "error")
         return error_msg
         
     except Exception as e:
+        import traceback
+        _execution_error.inc()
+        _execution_errors.labels(type(e).__name__).inc()
         error_msg = f"{type(e).__name__}: {str(e)}"
         tb = traceback.format_exc()
         if callback:
-            callback(error_msg, "error")
-            callback(tb, "error")
+            _callbacks_total.labels("error").inc(2)
+            with _tracer.span("callback", line_type="error"):
+                callback(error_msg, "error")
+                callback(tb, "error")
+            if plots:
+                _callbacks_total.labels("plot").inc(len(plots))
+                with _tracer.span("plots_emit", count=len(plots)):
+                    emit_plots(plots, callback)
         return f"{error_msg}\n{tb}"
 
 
+# Persistent session defaults
+SESSION_IDLE_TIMEOUT = 30 * 60
+SESSION_MEMORY_LIMIT_MB = 256
+
+
+class KernelSession:
+    """Named namespace that survives across executions, like a notebook kernel"""
+    
+    def __init__(self, name, idle_timeout=SESSION_IDLE_TIMEOUT,
+                 memory_limit_mb=SESSION_MEMORY_LIMIT_MB):
+        self.name = name
+        self.idle_timeout = idle_timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.lock = _thread.RLock()
+        self.namespace = _new_namespace()
+        self.created = time.monotonic()
+        self.last_used = self.created
+        self.executions = 0
+        
+    def reset(self):
+        with self.lock:
+            self.namespace = _new_namespace()
+            
+    def memory_bytes(self):
+        """Estimated size of the session's variables"""
+        from pygenius_inspect import deep_estimate_bytes, _SKIP_TYPES
+        total = 0
+        for name, value in list(self.namespace.items()):
+            if name.startswith('_') or name in LAZY_MODULES or isinstance(value, _SKIP_TYPES):
+                continue
+            total += deep_estimate_bytes(value) or 0
+        return total
+        
+    def enforce_memory_limit(self, callback=None):
+        """Reset the namespace if it grew past the cap; returns True if reset"""
+        if not self.memory_limit_mb:
+            return False
+        used_mb = self.memory_bytes() / (1024 * 1024)
+        if used_mb <= self.memory_limit_mb:
+            return False
+        self.reset()
+        if callback:
+            callback(f"MemoryLimit: session '{self.name}' used {used_mb:.1f} MB "
+                     f"(limit {self.memory_limit_mb} MB); its variables were cleared", "error")
+        return True
+        
+    def is_idle(self, now=None):
+        now = time.monotonic() if now is None else now
+        return bool(self.idle_timeout) and now - self.last_used > self.idle_timeout
+        
+    def info(self):
+        now = time.monotonic()
+        return {
+            'name': self.name,
+            'executions': self.executions,
+            'variables': sum(1 for name in self.namespace
+                             if not name.startswith('_') and name not in LAZY_MODULES),
+            'memory_bytes': self.memory_bytes(),
+            'memory_limit_mb': self.memory_limit_mb,
+            'idle_seconds': now - self.last_used,
+            'idle_timeout': self.idle_timeout,
+            'age_seconds': now - self.created,
+        }
+
+
+_sessions = {}
+_sessions_lock = _thread.allocate_lock()
+
+_metrics.gauge("pygenius_sessions", "Live persistent sessions").set_function(
+    lambda: len(_sessions))
+
+
+def _expire_idle_sessions():
+    now = time.monotonic()
+    with _sessions_lock:
+        for name, kernel in list(_sessions.items()):
+            if not kernel.is_idle(now):
+                continue
+            # A session that is executing is not idle, however long it runs
+            if not kernel.lock.acquire(blocking=False):
+                continue
+            try:
+                del _sessions[name]
+            finally:
+                kernel.lock.release()
+
+
+@_instrumented
+def get_session(name, idle_timeout=None, memory_limit_mb=None):
+    """
+    Return the named session, creating it if needed
+    
+    Sessions idle for longer than their timeout are dropped first, so a
+    name that expired comes back with a fresh namespace.
+    """
+    _expire_idle_sessions()
+    with _sessions_lock:
+        kernel = _sessions.get(name)
+        if kernel is None:
+            kernel = KernelSession(
+                name,
+                idle_timeout=SESSION_IDLE_TIMEOUT if idle_timeout is None else idle_timeout,
+                memory_limit_mb=SESSION_MEMORY_LIMIT_MB if memory_limit_mb is None else memory_limit_mb)
+            _sessions[name] = kernel
+        else:
+            if idle_timeout is not None:
+                kernel.idle_timeout = idle_timeout
+            if memory_limit_mb is not None:
+                kernel.memory_limit_mb = memory_limit_mb
+        return kernel
+
+
+@_instrumented
+def reset_session(name):
+    """Clear a session's variables; returns False if it does not exist"""
+    with _sessions_lock:
+        kernel = _sessions.get(name)
+    if kernel is None:
+        return False
+    kernel.reset()
+    return True
+
+
+@_instrumented
+def close_session(name):
+    """Drop a session and its namespace; returns False if it does not exist"""
+    with _sessions_lock:
+        return _sessions.pop(name, None) is not None
+
+
+@_instrumented
+def list_sessions():
+    """Live sessions with their estimated memory footprint"""
+    _expire_idle_sessions()
+    with _sessions_lock:
+        kernels = list(_sessions.values())
+    return [kernel.info() for kernel in kernels]
+
+
+@_instrumented
+def execute_cells(cells, callback=None, session="cells"):
+    """
+    Run notebook-style cells, re-executing only what changed
+    
+    Args:
+        cells: List of cell sources, or one script split at "# %%" lines
+        callback: Function called with (line, line_type) for each output
+        session: Persistent session holding the shared namespace
+        
+    Returns:
+        Report dict with per-cell status (ran/skipped/error/not_run),
+        reads/writes, timings, the time saved by skipped cells and the
+        names dropped because only removed cells wrote them; also sent as
+        a "cells" callback
+    """
+    from pygenius_cells import run_cells
+    with _tracer.trace("execute_cells", session=session):
+        report = run_cells(cells, callback, session)
+        _emit_report("cells", report, callback)
+    return report
+
+
+@_instrumented
+def snapshot_namespace(namespace=None, path=None, max_vars=100, max_items=50):
+    """
+    Structured, size-bounded snapshot of execution variables
+    
+    Args:
+        namespace: Namespace to inspect (defaults to the last execution's)
+        path: Optional drill-down path, e.g. ['data', 'rows', 0]
+        max_vars: Maximum number of top-level variables reported
+        max_items: Maximum number of children reported when drilling down
+        
+    Returns:
+        Dict with a "variables" list of records (name, type, len, shape,
+        dtype, bytes, expandable), "total" and "truncated"
+    """
+    from pygenius_inspect import snapshot
+    if namespace is None:
+        namespace = _last_namespace
+    try:
+        return snapshot(namespace, path=path, max_vars=max_vars,
+                        max_items=max_items, skip=LAZY_MODULES)
+    except KeyError as e:
+        return {'variables': [], 'total': 0, 'truncated': False,
+                'error': f"Path not found: {e}"}
+
+
+@_instrumented
+def preview_variable(path, row_start=0, row_count=50, col_start=0, col_count=20,
+                     namespace=None):
+    """
+    One page of a large ndarray, DataFrame, Series or bytes value
+    
+    Only the requested window is formatted; slicing goes through views, so
+    paging through a 10M-row DataFrame takes constant memory. Summary
+    statistics are computed once per object and execution.
+    
+    Args:
+        path: Variable name or drill-down path (see snapshot_namespace)
+        row_start, row_count: Rows to return
+        col_start, col_count: Columns to return
+        namespace: Namespace to inspect (defaults to the last execution's)
+        
+    Returns:
+        Dict with shape, dtype, rows/cols ranges, index/columns labels,
+        values (rows of display strings) and stats, or an "error" key
+    """
+    from pygenius_inspect import resolve_path
+    from pygenius_preview import preview
+    if namespace is None:
+        namespace = _last_namespace
+    if isinstance(path, str):
+        path = [path]
+    try:
+        value = resolve_path(namespace, path)
+        return preview(value, rows=(row_start, row_count), cols=(col_start, col_count),
+                       generation=_execution_count)
+    except KeyError as e:
+        return {'error': f"Path not found: {e}"}
+    except TypeError as e:
+        return {'error': str(e)}
+
+
+@_instrumented
+def get_last_profile():
+    """Return the sampling profile of the last execution (None if not profiled)"""
+    return _last_reports.get('profile')
+
+
+@_instrumented
+def get_last_memory_report():
+    """Return the tracemalloc report of the last execution (None if not traced)"""
+    return _last_reports.get('memory')
+
+
+def _invalidate_packages():
+    """Make the next list_packages() rescan the install directories"""
+    from pygenius_packages import invalidate
+    invalidate()
+
+
+@_instrumented
 def pip_install(package_name):
     """Install a Python package using pip"""
+    import subprocess
     try:
         result = subprocess.run(
             [sys.executable, "-m", "pip", "install", package_name],
@@ -126,6 +1082,7 @@ def pip_install(package_name):
             text=True,
             timeout=120
         )
+        _invalidate_packages()
         if result.returncode == 0:
             return f"✓ Successfully installed {package_name}"
         else:
@@ -134,8 +1091,34 @@ def pip_install(package_name):
         return f"✗ Error installing {package_name}: {str(e)}"
 
 
+@_instrumented
+def pip_install_batch(package_names, callback=None, cancel_event=None):
+    """
+    Install several packages in one resolution, streaming pip progress
+    
+    Previously downloaded wheels are installed offline from a local
+    wheelhouse. Set cancel_event (a threading.Event) to abort.
+    """
+    names = ", ".join(package_names)
+    try:
+        from pygenius_packages import install_batch
+        result = install_batch(package_names, callback, cancel_event=cancel_event)
+        if result["ok"]:
+            source = " (from local wheel cache)" if result["offline"] else ""
+            return f"✓ Successfully installed {names}{source}"
+        elif result["cancelled"]:
+            return f"✗ Installation of {names} cancelled"
+        else:
+            output = "\n".join(result["output"])
+            return f"✗ Failed to install {names}:\n{output}"
+    except Exception as e:
+        return f"✗ Error installing {names}: {str(e)}"
+
+
+@_instrumented
 def pip_uninstall(package_name):
     """Uninstall a Python package using pip"""
+    import subprocess
     try:
         result = subprocess.run(
             [sys.executable, "-m", "pip", "uninstall", "-y", package_name],
@@ -143,6 +1126,7 @@ def pip_uninstall(package_name):
             text=True,
             timeout=60
         )
+        _invalidate_packages()
         if result.returncode == 0:
             return f"✓ Successfully uninstalled {package_name}"
         else:
@@ -151,79 +1135,68 @@ def pip_uninstall(package_name):
         return f"✗ Error uninstalling {package_name}: {str(e)}"
 
 
+@_instrumented
 def list_packages():
-    """List installed Python packages"""
+    """List installed Python packages (cached, see pygenius_packages)"""
     try:
-        installed = sorted(
-            [{"name": d.project_name, "version": d.version} 
-             for d in pkg_resources.working_set],
-            key=lambda x: x["name"].lower()
-        )
-        return installed
+        from pygenius_packages import list_installed
+        return list_installed()
     except Exception as e:
         return [{"name": "Error", "version": str(e)}]
 
 
+@_instrumented
 def analyze_code_for_bugs(code):
     """
     AI-powered static analysis for common Python bugs
     Returns list of potential issues
+    
+    Uses a single-pass AST analyzer with proper scoping; each issue is a
+    dict with line, type, message and severity.
+    """
+    from pygenius_analyzer import analyze
+    return analyze(code)
+
+
+_analysis_sessions = {}
+
+
+@_instrumented
+def analyze_code_incremental(code, session="editor"):
+    """
+    Keystroke-friendly variant of analyze_code_for_bugs
+    
+    Keeps per-block results for the named session and only re-analyzes
+    top-level blocks whose text changed since the previous call.
     """
-    issues = []
-    lines = code.split('\n')
-    
-    for i, line in enumerate(lines, 1):
-        line_stripped = line.strip()
-        
-        # Check for division that could cause ZeroDivisionError
-        if '/' in line and '= 0' not in line:
-            if any(x in line for x in ['/0', '/ 0', '/variable', '/ value']):
-                issues.append({
-                    'line': i,
-                    'type': 'warning',
-                    'message': 'Possible ZeroDivisionError - ensure divisor is not zero',
-                    'severity': 'high'
-                })
-        
-        # Check for unused variables (simple heuristic)
-        if '=' in line and '==' not in line:
-            var_name = line.split('=')[0].strip()
-            # Check if variable is used later
-            used = False
-            for j in range(i, len(lines)):
-                if var_name in lines[j] and lines[j].find('=') != lines[j].find(var_name):
-                    used = True
-                    break
-            if not used and var_name.isidentifier():
-                issues.append({
-                    'line': i,
-                    'type': 'info',
-                    'message': f"Variable '{var_name}' may be unused (dead code)",
-                    'severity': 'low'
-                })
-        
-        # Check for mutable default arguments
-        if 'def ' in line and '=' in line:
-            if '[]' in line or '{}' in line:
-                issues.append({
-                    'line': i,
-                    'type': 'warning',
-                    'message': 'Mutable default argument detected - use None and initialize inside function',
-                    'severity': 'medium'
-                })
-        
-        # Check for bare except
-        if 'except:' in line and 'Exception' not in line:
-            issues.append({
-                'line': i,
-                'type': 'warning',
-                'message': 'Bare except clause - catch specific exceptions instead',
-                'severity': 'medium'
-            })
-    
-    return issues
+    from pygenius_analyzer import AnalysisSession
+    if session not in _analysis_sessions:
+        _analysis_sessions[session] = AnalysisSession()
+    return _analysis_sessions[session].update(code)
 
 
+@_instrumented
+def get_analysis_stats(session="editor"):
+    """Blocks reused vs recomputed by the last incremental analysis"""
+    analysis = _analysis_sessions.get(session)
+    return dict(analysis.stats) if analysis else None
+
+
+@_instrumented
+def get_rule_timings():
+    """Cumulative time spent in each analyzer rule, most expensive first"""
+    from pygenius_analyzer import get_rule_timings as rule_timings
+    return rule_timings()
+
+
+@_instrumented
+def set_rule_enabled(name, enabled=True):
+    """Enable or disable an analyzer rule by name"""
+    from pygenius_analyzer import set_rule_enabled as set_enabled
+    return set_enabled(name, enabled)
+
+
+@_instrumented
 def explain_error(error_message, code_context):
     """
     Generate AI explanation for Python errors
@@ -255,6 +1228,7 @@ def explain_error(error_message, code_context):
     }
 
 
+@_instrumented
 def get_fix_suggestion(error_type, code_context):
     """Get fix suggestion based on error type"""
     suggestions = {
@@ -265,3 +1239,66 @@ def get_fix_suggestion(error_type, code_context):
         'AttributeError': 'Check object type or use hasattr(obj, "attribute")'
     }
     return suggestions.get(error_type, 'Review the code carefully and fix the issue.')
+
+
+def get_metrics():
+    """
+    Runtime metrics as JSON text
+    
+    Counters, gauges and latency histograms (seconds) keyed by metric name,
+    each with its type, help text and one sample per label combination.
+    """
+    return _metrics.to_json()
+
+
+def get_metrics_prometheus():
+    """Runtime metrics in the Prometheus text exposition format"""
+    return _metrics.to_prometheus()
+
+
+def reset_metrics():
+    """Zero all runtime metrics"""
+    _metrics.reset()
+
+
+def configure_tracing(enabled=None, capacity=None, clear=False):
+    """
+    Configure per-execution phase tracing
+    
+    Args:
+        enabled: Turn span recording on or off
+        capacity: Number of recent executions kept in the ring buffer
+        clear: Drop the recorded traces
+    """
+    if enabled is not None:
+        _tracer.enabled = enabled
+    if capacity is not None:
+        _tracer.resize(capacity)
+    if clear:
+        _tracer.clear()
+    return {'enabled': _tracer.enabled, 'capacity': _tracer.traces.maxlen,
+            'traces': len(_tracer.traces)}
+
+
+def get_traces(last=None):
+    """
+    Phase spans of recent executions, oldest first
+    
+    Each trace has the execution's duration and its spans (compile, exec,
+    callback, output_flush, namespace_snapshot...), each with id, parent
+    id, monotonic start_ns and duration_ms.
+    """
+    return _tracer.get_traces(last)
+
+
+def export_chrome_trace(path=None, last=None):
+    """
+    Recent executions as Chrome trace-event JSON, for chrome://tracing or
+    Perfetto; also written to path if given
+    """
+    import json
+    text = json.dumps(_tracer.chrome_trace(last))
+    if path:
+        with open(path, 'w') as f:
+            f.write(text)
+    return text
@@ -0,0 +1,259 @@
+"""
+PyGenius AI Sandbox - resource-limited subprocess execution with hard timeouts
+"""
+import os
+import time
+import signal
+import threading
+import multiprocessing
+
+from pygenius_pool import _PipeCallback, _current_rss_kb
+
+# Default limits for isolated runs
+DEFAULT_TIMEOUT = 30
+DEFAULT_CPU_SECONDS = 20
+DEFAULT_MEMORY_MB = 512
+
+# How often the parent samples the child's RSS while waiting
+_POLL_INTERVAL = 0.1
+
+
+class CpuLimitExceeded(BaseException):
+    """Raised inside the child when RLIMIT_CPU's soft limit fires (SIGXCPU)"""
+
+
+def _on_sigxcpu(signum, frame):
+    raise CpuLimitExceeded()
+
+
+def _apply_limits(cpu_seconds, memory_mb):
+    try:
+        import resource
+    except ImportError:
+        return
+    if cpu_seconds:
+        # SIGXCPU at the soft limit, SIGKILL one second later if ignored
+        signal.signal(signal.SIGXCPU, _on_sigxcpu)
+        used = resource.getrusage(resource.RUSAGE_SELF)
+        soft = int(used.ru_utime + used.ru_stime + cpu_seconds) + 1
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, soft + 1))
+    if memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _cpu_seconds_used():
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+class _ErrorTracker:
+    """Child-side callback that notes error lines and optionally forwards all"""
+
+    def __init__(self, forward):
+        self.forward = forward
+        self.first_error = None
+
+    def __call__(self, text, line_type):
+        if line_type == "error" and self.first_error is None:
+            self.first_error = text
+        if self.forward:
+            self.forward(text, line_type)
+
+
+def _sandbox_main(conn, code, stream, cpu_seconds, memory_mb):
+    """Child entry point: apply rlimits, run the code, report usage"""
+    import pygenius_runtime
+
+    _apply_limits(cpu_seconds, memory_mb)
+    pipe = _PipeCallback(conn, 0)
+    tracker = _ErrorTracker(pipe if stream else None)
+    cpu_start = _cpu_seconds_used()
+    status, limit = "ok", None
+    try:
+        output = pygenius_runtime.execute_code(code, tracker)
+        error = tracker.first_error
+        if error is not None:
+            if error.startswith("MemoryError"):
+                status, limit = "memory_limit", "memory"
+            else:
+                status = "error"
+    except CpuLimitExceeded:
+        status, limit = "cpu_limit", "cpu_time"
+        output = f"CPU time limit of {cpu_seconds}s exceeded"
+    except MemoryError:
+        status, limit = "memory_limit", "memory"
+        output = f"Memory limit of {memory_mb} MB exceeded"
+    except BaseException as e:
+        status = "error"
+        output = f"{type(e).__name__}: {e}"
+
+    # The parent stops reading at "result": deliver output still waiting
+    # for its flush deadline (a limit may have cut execute_code short)
+    pygenius_runtime._deadline_flusher.flush_all()
+    cpu_end = _cpu_seconds_used()
+    cpu_time = cpu_end - cpu_start if cpu_start is not None else None
+    pipe.send("result", {
+        "status": status,
+        "limit": limit,
+        "output": output,
+        "cpu_time": cpu_time,
+        "max_rss_kb": _current_rss_kb(),
+    })
+    conn.close()
+
+
+class IsolatedExecution:
+    """
+    Handle for code running in a resource-limited child process
+
+    The child gets an RLIMIT_CPU and RLIMIT_AS limit; the parent enforces a
+    wall-clock timeout and can kill the child at any time with cancel().
+    Callbacks are delivered from a background reader thread.
+
+    Args:
+        code: Python code string to execute
+        callback: Function called with (line, line_type) for each output
+        timeout: Wall-clock limit in seconds (None for no limit)
+        cpu_seconds: CPU time limit in seconds (None for no limit)
+        memory_mb: Address-space limit in MiB (None for no limit)
+    """
+
+    def __init__(self, code, callback=None, timeout=DEFAULT_TIMEOUT,
+                 cpu_seconds=DEFAULT_CPU_SECONDS, memory_mb=DEFAULT_MEMORY_MB):
+        self.callback = callback
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self._cancelled = threading.Event()
+        self._result = None
+        self._peak_rss_kb = 0
+
+        methods = multiprocessing.get_all_start_methods()
+        ctx = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+        self._conn, child_conn = ctx.Pipe(duplex=False)
+        self._started = time.monotonic()
+        self.process = ctx.Process(
+            target=_sandbox_main,
+            args=(child_conn, code, callback is not None, cpu_seconds, memory_mb),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+        self._reader = threading.Thread(target=self._pump, daemon=True)
+        self._reader.start()
+
+    def _sample_rss(self):
+        try:
+            with open(f"/proc/{self.process.pid}/statm") as f:
+                resident_pages = int(f.read().split()[1])
+            rss_kb = resident_pages * os.sysconf("SC_PAGE_SIZE") // 1024
+            self._peak_rss_kb = max(self._peak_rss_kb, rss_kb)
+        except (OSError, ValueError, IndexError, AttributeError):
+            pass
+
+    def _pump(self):
+        deadline = self._started + self.timeout if self.timeout else None
+        report = None
+        status = None
+        try:
+            while True:
+                if self._cancelled.is_set():
+                    status = "cancelled"
+                    break
+                if deadline is not None and time.monotonic() >= deadline:
+                    status = "timeout"
+                    break
+                self._sample_rss()
+                if not self._conn.poll(_POLL_INTERVAL):
+                    continue
+                message = self._conn.recv()
+                if message[0] == "callback":
+                    if self.callback:
+                        self.callback(message[2], message[3])
+                elif message[0] == "result":
+                    report = message[2]
+                    break
+        except (EOFError, OSError):
+            pass
+
+        if report is None and self._cancelled.is_set():
+            status = "cancelled"
+        if status is not None:
+            self._kill()
+        self.process.join()
+        self._conn.close()
+        self._result = self._build_result(status, report)
+
+    def _kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+
+    def _build_result(self, status, report):
+        wall_time = time.monotonic() - self._started
+        exit_code = self.process.exitcode
+        result = {
+            "status": status,
+            "limit": None,
+            "output": "",
+            "wall_time": wall_time,
+            "cpu_time": None,
+            "max_rss_kb": self._peak_rss_kb,
+            "exit_code": exit_code,
+        }
+        if report is not None:
+            result.update(report)
+            result["max_rss_kb"] = max(self._peak_rss_kb, report["max_rss_kb"] or 0)
+        elif status == "timeout":
+            result["limit"] = "wall_time"
+            result["output"] = f"Wall-clock limit of {self.timeout}s exceeded"
+        elif status == "cancelled":
+            result["output"] = "Execution cancelled"
+        elif exit_code == -getattr(signal, "SIGKILL", 9) and self.cpu_seconds:
+            # Hard RLIMIT_CPU limit (or the OOM killer) took the child down
+            result["status"], result["limit"] = "cpu_limit", "cpu_time"
+            result["output"] = f"CPU time limit of {self.cpu_seconds}s exceeded"
+        else:
+            result["status"] = "crashed"
+            result["output"] = f"Execution process exited with code {exit_code}"
+
+        if result["status"] not in ("ok", "error") and self.callback:
+            self.callback(result["output"], "error")
+        return result
+
+    def cancel(self):
+        """Kill the child process; wait() then reports status 'cancelled'"""
+        self._cancelled.set()
+        self._kill()
+
+    @property
+    def done(self):
+        return self._result is not None
+
+    def wait(self, timeout=None):
+        """
+        Block until the run finishes
+
+        Returns:
+            Result dict with status ('ok', 'error', 'timeout', 'cpu_limit',
+            'memory_limit', 'cancelled' or 'crashed'), limit (which limit was
+            hit, if any), output, wall_time, cpu_time, max_rss_kb and exit_code;
+            None if timeout expired first
+        """
+        self._reader.join(timeout)
+        return self._result
+
+
+def start_isolated(code, callback=None, **limits):
+    """Start code in a resource-limited child process and return its handle"""
+    return IsolatedExecution(code, callback, **limits)
+
+
+def execute_isolated(code, callback=None, **limits):
+    """Run code in a resource-limited child process and return its result dict"""
+    return IsolatedExecution(code, callback, **limits).wait()
@@ -0,0 +1,214 @@
+"""
+PyGenius AI Tracing - per-execution phase spans with Chrome trace export
+"""
+import os
+import time
+import _thread
+from collections import deque
+from itertools import count
+
+DEFAULT_CAPACITY = 32
+# Spans kept per trace; later ones are counted as dropped
+DEFAULT_MAX_SPANS = 4096
+
+_clock = time.perf_counter_ns
+
+
+class Span:
+    """
+    One timed phase; also its own context manager, so opening a span
+    allocates a single object
+    """
+    __slots__ = ("id", "parent", "name", "start", "end", "args", "trace")
+
+    def __init__(self, span_id, parent, name, args, trace=None):
+        self.id = span_id
+        self.parent = parent
+        self.name = name
+        self.args = args
+        self.trace = trace
+        self.start = _clock()
+        self.end = None
+
+    def __enter__(self):
+        self.trace.stack.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = _clock()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        trace = self.trace
+        trace.stack.pop()
+        if len(trace.spans) < trace.max_spans:
+            trace.spans.append(self)
+        else:
+            trace.dropped += 1
+        return False
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "parent": self.parent,
+            "name": self.name,
+            "start_ns": self.start,
+            "duration_ms": ((self.end or _clock()) - self.start) / 1e6,
+            "args": self.args,
+        }
+
+
+class Trace:
+    """Spans recorded on one thread for one execution"""
+
+    def __init__(self, trace_id, name, args, max_spans):
+        self.id = trace_id
+        self.thread = _thread.get_ident()
+        self.max_spans = max_spans
+        self.spans = []
+        self.dropped = 0
+        self._ids = count(1)
+        self.root = Span(0, None, name, args)
+        self.stack = [self.root]
+
+    def span(self, name, args):
+        return Span(next(self._ids), self.stack[-1].id, name, args, self)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.root.name,
+            "thread": self.thread,
+            "start_ns": self.root.start,
+            "duration_ms": self.root.to_dict()["duration_ms"],
+            "args": self.root.args,
+            "spans": [span.to_dict() for span in sorted(self.spans, key=lambda s: s.start)],
+            "dropped": self.dropped,
+        }
+
+
+class _NullScope:
+    """Returned when nothing is being traced on this thread"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class _TraceScope:
+    __slots__ = ("tracer", "trace")
+
+    def __init__(self, tracer, trace):
+        self.tracer = tracer
+        self.trace = trace
+
+    def __enter__(self):
+        self.tracer._local.trace = self.trace
+        return self.trace
+
+    def __exit__(self, exc_type, exc, tb):
+        trace = self.trace
+        trace.root.end = _clock()
+        if exc_type is not None:
+            trace.root.args["error"] = exc_type.__name__
+        self.tracer._local.trace = None
+        with self.tracer._lock:
+            self.tracer.traces.append(trace)
+        return False
+
+
+class Tracer:
+    """
+    Records nested, monotonic-clock spans per execution
+
+    trace() opens the per-execution root on the current thread; span()
+    opens a child of whatever span is open on that thread and is a no-op
+    when no trace is active, so instrumented helpers cost almost nothing
+    outside an execution. Finished traces are kept in a ring buffer of
+    the last `capacity` executions.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, max_spans=DEFAULT_MAX_SPANS):
+        self.enabled = True
+        self.max_spans = max_spans
+        self.traces = deque(maxlen=capacity)
+        self._ids = count(1)
+        self._lock = _thread.allocate_lock()
+        self._local = _thread._local()
+
+    def current(self):
+        return getattr(self._local, "trace", None)
+
+    def trace(self, name, **args):
+        """Root scope for one execution; nested calls become plain spans"""
+        if not self.enabled:
+            return _NULL_SCOPE
+        current = self.current()
+        if current is not None:
+            return current.span(name, args)
+        return _TraceScope(self, Trace(next(self._ids), name, args, self.max_spans))
+
+    def span(self, name, **args):
+        trace = getattr(self._local, "trace", None)
+        if trace is None:
+            return _NULL_SCOPE
+        return Span(next(trace._ids), trace.stack[-1].id, name, args, trace)
+
+    def resize(self, capacity):
+        with self._lock:
+            self.traces = deque(self.traces, maxlen=capacity)
+
+    def clear(self):
+        with self._lock:
+            self.traces.clear()
+
+    def get_traces(self, last=None):
+        """Finished traces as dicts, oldest first"""
+        with self._lock:
+            traces = list(self.traces)
+        if last is not None:
+            traces = traces[-last:] if last > 0 else []
+        return [trace.to_dict() for trace in traces]
+
+    def chrome_trace(self, last=None):
+        """Finished traces in Chrome trace-event format (chrome://tracing, Perfetto)"""
+        return to_chrome_trace(self.get_traces(last))
+
+
+def to_chrome_trace(traces):
+    """Convert trace dicts to a Chrome trace-event JSON object"""
+    pid = os.getpid()
+    events = []
+    for trace in traces:
+        tid = trace["thread"]
+        events.append(_complete_event(trace["name"], trace["start_ns"], trace["duration_ms"],
+                                      pid, tid, dict(trace["args"], trace_id=trace["id"],
+                                                     dropped_spans=trace["dropped"])))
+        for span in trace["spans"]:
+            events.append(_complete_event(span["name"], span["start_ns"], span["duration_ms"],
+                                          pid, tid, dict(span["args"], trace_id=trace["id"],
+                                                         span_id=span["id"],
+                                                         parent_id=span["parent"])))
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def _complete_event(name, start_ns, duration_ms, pid, tid, args):
+    return {
+        "name": name,
+        "cat": "pygenius",
+        "ph": "X",
+        "ts": start_ns / 1000,
+        "dur": duration_ms * 1000,
+        "pid": pid,
+        "tid": tid,
+        "args": {key: value if isinstance(value, (int, float, str, bool, type(None))) else repr(value)
+                 for key, value in args.items()},
+    }
+
+
+tracer = Tracer()
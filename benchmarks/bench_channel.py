@@ -0,0 +1,123 @@
+"""
+Messages per second: per-call callback path vs the batched binary channel
+
+The host bridge is modelled as a fixed cost per crossing (--crossing-us),
+since the real JNI/Chaquopy hop cannot be measured off-device. Batches are
+decoded in Python on the host side, which makes the comparison conservative.
+
+    python benchmarks/bench_channel.py --messages 100000 --crossing-us 20
+"""
+import os
+import sys
+import json
+import time
+import base64
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "app", "src", "main", "python"))
+
+from pygenius_channel import MessageChannel, decode_batch  # noqa: E402
+
+PLOT_BYTES = os.urandom(20 * 1024)
+VARIABLES = json.dumps({"variables": [
+    {"name": f"v{i}", "type": "int", "len": None, "shape": None, "dtype": None,
+     "bytes": 28, "expandable": False, "preview": str(i)} for i in range(5)
+], "total": 5, "truncated": False})
+
+
+def workload(count):
+    """Typical mix: output lines, progress, variable snapshots, a few plots"""
+    messages = []
+    for i in range(count):
+        slot = i % 100
+        if slot < 70:
+            messages.append(("output", f"step {i}: loss=0.{i % 997:03d}\n"))
+        elif slot < 90:
+            messages.append(("progress", f"Downloading package-{i}.whl ({slot}%)"))
+        elif slot < 99:
+            messages.append(("variables", VARIABLES))
+        else:
+            messages.append(("plot", PLOT_BYTES))
+    return messages
+
+
+def cross(crossing_us):
+    """Stand-in for one host bridge call"""
+    if crossing_us:
+        deadline = time.perf_counter() + crossing_us / 1e6
+        while time.perf_counter() < deadline:
+            pass
+
+
+def run_per_call(messages, crossing_us):
+    received = []
+
+    def callback(text, line_type):
+        cross(crossing_us)
+        received.append(len(text))
+
+    start = time.perf_counter()
+    for line_type, payload in messages:
+        if line_type == "plot":
+            # The per-call path ships plots as base64 JSON text
+            payload = json.dumps({"format": "png",
+                                  "data": base64.b64encode(payload).decode("ascii")})
+        callback(payload, line_type)
+    elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "crossings": len(received)}
+
+
+def run_channel(messages, crossing_us, batch_bytes):
+    received = []
+
+    def sink(batch):
+        cross(crossing_us)
+        received.extend(line_type for line_type, _, _ in decode_batch(batch))
+
+    start = time.perf_counter()
+    channel = MessageChannel(sink, batch_bytes=batch_bytes)
+    for line_type, payload in messages:
+        if line_type == "plot":
+            channel.send(line_type, payload, {"format": "png"})
+        else:
+            channel(payload, line_type)
+    channel.close()
+    elapsed = time.perf_counter() - start
+    assert len(received) == len(messages)
+    return {"seconds": elapsed, "crossings": channel.batches_sent}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--crossing-us", type=float, default=20.0,
+                        help="Simulated cost of one host bridge crossing")
+    parser.add_argument("--batch-bytes", type=int, default=64 * 1024)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    messages = workload(args.messages)
+    results = {}
+    for name, run in (("per_call", lambda: run_per_call(messages, args.crossing_us)),
+                      ("channel", lambda: run_channel(messages, args.crossing_us,
+                                                      args.batch_bytes))):
+        result = run()
+        result["messages_per_sec"] = len(messages) / result["seconds"]
+        results[name] = result
+    results["speedup"] = (results["channel"]["messages_per_sec"]
+                          / results["per_call"]["messages_per_sec"])
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for name in ("per_call", "channel"):
+            r = results[name]
+            print(f"{name:>9}: {r['messages_per_sec']:>12,.0f} msg/s "
+                  f"({r['crossings']} crossings, {r['seconds']:.3f} s)")
+        print(f"  speedup: {results['speedup']:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Cold import time of pygenius_runtime, measured with python -X importtime
+
+Each run imports the module in a fresh interpreter (bytecode precompiled, as
+on device). Fails when the median cumulative import time exceeds the budget
+or when a module that should load lazily is pulled in at import time.
+
+    python benchmarks/bench_import.py --budget-ms 10
+"""
+import os
+import re
+import sys
+import json
+import argparse
+import compileall
+import statistics
+import subprocess
+
+PYTHON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          "..", "app", "src", "main", "python")
+
+# Modules the runtime only needs inside specific functions
+DEFAULT_FORBIDDEN = ("subprocess", "json", "traceback", "pkg_resources", "hashlib")
+
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)\s*$")
+
+
+def parse_importtime(stderr, module):
+    """
+    Parse -X importtime output
+
+    Returns:
+        (cumulative_us of module, {imported module: self_us} for everything
+        imported while importing it)
+    """
+    children = {}
+    for line in stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        if not indent:
+            if name == module:
+                return int(cumulative_us), children
+            # Nested imports are printed before their parent, so a new
+            # top-level line closes the previous group
+            children = {}
+        else:
+            children[name] = int(self_us)
+    raise ValueError(f"{module} not found in -X importtime output")
+
+
+def measure(module, env):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PYTHON_DIR, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return parse_importtime(result.stderr, module)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="pygenius_runtime")
+    parser.add_argument("--budget-ms", type=float, default=10.0)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--forbid", default=",".join(DEFAULT_FORBIDDEN),
+                        help="Comma-separated modules that must not load at import time")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    compileall.compile_dir(PYTHON_DIR, quiet=1)
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+
+    runs = [measure(args.module, env) for _ in range(args.runs)]
+    totals = sorted(total for total, _ in runs)
+    median_ms = statistics.median(totals) / 1000
+    # Report the breakdown of the run closest to the median
+    _, children = min(runs, key=lambda run: abs(run[0] / 1000 - median_ms))
+    forbidden = [name for name in args.forbid.split(",") if name and name in children]
+
+    result = {
+        "module": args.module,
+        "runs": args.runs,
+        "median_ms": median_ms,
+        "min_ms": totals[0] / 1000,
+        "max_ms": totals[-1] / 1000,
+        "budget_ms": args.budget_ms,
+        "slowest_imports": sorted(children.items(), key=lambda kv: kv[1], reverse=True)[:10],
+        "forbidden_imports": forbidden,
+        "ok": median_ms <= args.budget_ms and not forbidden,
+    }
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{args.module}: median {median_ms:.1f} ms "
+              f"(min {result['min_ms']:.1f}, max {result['max_ms']:.1f}, "
+              f"budget {args.budget_ms:.1f}) over {args.runs} runs")
+        for name, self_us in result["slowest_imports"]:
+            print(f"  {self_us / 1000:7.2f} ms  {name}")
+        if forbidden:
+            print(f"FAIL: imported at import time: {', '.join(forbidden)}")
+        elif not result["ok"]:
+            print("FAIL: over budget")
+    return 0 if result["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""
+Benchmark suite for the runtime hot paths
+
+Times execute_code, PyGeniusOutput.write, analyze_code_for_bugs,
+explain_error and list_packages on representative workloads, appends the
+results to a JSON-lines history file and compares them with a stored
+baseline. Exits non-zero when a benchmark's median regressed by more than
+the threshold.
+
+    python benchmarks/bench_runtime.py                  # run and compare
+    python benchmarks/bench_runtime.py --save-baseline  # run and store baseline
+    python benchmarks/bench_runtime.py -k analyze       # only matching benchmarks
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "app", "src", "main", "python"))
+
+import pygenius_runtime  # noqa: E402
+
+RESULTS_DIR = os.path.join(HERE, "results")
+DEFAULT_HISTORY = os.path.join(RESULTS_DIR, "history.jsonl")
+DEFAULT_BASELINE = os.path.join(RESULTS_DIR, "baseline.json")
+DEFAULT_THRESHOLD = 0.10
+
+
+def _discard(text, line_type):
+    pass
+
+
+def analyzer_input(lines):
+    """Synthetic module of roughly the given size with a mix of issues"""
+    chunks = []
+    index = 0
+    while sum(chunk.count("\n") for chunk in chunks) < lines:
+        chunks.append(
+            f"def handler_{index}(items, cache={{}}, scale=2):\n"
+            f"    total = 0\n"
+            f"    unused_{index} = len(items)\n"
+            f"    for i, item in enumerate(items):\n"
+            f"        if item is None:\n"
+            f"            continue\n"
+            f"        try:\n"
+            f"            total += item / scale\n"
+            f"        except:\n"
+            f"            total -= 1\n"
+            f"    return total / 0 if not items else total\n"
+            f"\n"
+            f"\n"
+            f"class Model{index}:\n"
+            f"    def __init__(self, values):\n"
+            f"        self.values = [v * 2 for v in values]\n"
+            f"\n"
+            f"    def mean(self):\n"
+            f"        return sum(self.values) / max(len(self.values), 1)\n"
+            f"\n"
+            f"\n"
+        )
+        index += 1
+    return "".join(chunks)
+
+
+# name -> (setup returning a zero-argument callable, calls per sample)
+def _benchmarks():
+    tiny = "x = 1 + 1\nprint(x)"
+    flood = "for i in range(20000):\n    print(i)"
+    numpy_script = (
+        "a = np.arange(200000, dtype=float).reshape(400, 500)\n"
+        "b = (a @ a.T).sum(axis=0)\n"
+        "print(b[:5].round(2), a.mean(), np.linalg.norm(b))"
+    )
+    errors = [
+        ("IndexError: list index out of range", "items[10]"),
+        ("KeyError: 'name'", "row['name']"),
+        ("ZeroDivisionError: division by zero", "1 / n"),
+        ("RecursionError: maximum recursion depth exceeded", "f()"),
+    ]
+    code_1k = analyzer_input(1000)
+    code_10k = analyzer_input(10000)
+
+    def output_writes():
+        output = pygenius_runtime.PyGeniusOutput(_discard, coalesce=True,
+                                                 head_lines=1000, tail_lines=1000)
+        for i in range(10000):
+            output.write(f"line {i}\n")
+        output.finish()
+
+    def explain_all():
+        for message, context in errors:
+            pygenius_runtime.explain_error(message, context)
+
+    benchmarks = {
+        "execute_code/tiny": (lambda: pygenius_runtime.execute_code(tiny, _discard), 20),
+        "execute_code/print_flood": (lambda: pygenius_runtime.execute_code(flood, _discard), 1),
+        "output_write/10k_lines": (output_writes, 1),
+        "analyze/1k_lines": (lambda: pygenius_runtime.analyze_code_for_bugs(code_1k), 1),
+        "analyze/10k_lines": (lambda: pygenius_runtime.analyze_code_for_bugs(code_10k), 1),
+        "explain_error/mixed": (explain_all, 1000),
+        "list_packages/indexed": (pygenius_runtime.list_packages, 10),
+    }
+    if pygenius_runtime._is_available("numpy"):
+        benchmarks["execute_code/numpy"] = (
+            lambda: pygenius_runtime.execute_code(numpy_script, _discard), 1)
+    return benchmarks
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_benchmark(func, calls, warmup, repeat):
+    """Time func; each sample is the mean per call over `calls` calls, in ms"""
+    for _ in range(warmup):
+        for _ in range(calls):
+            func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        samples.append((time.perf_counter() - start) * 1000 / calls)
+    return {
+        "median_ms": statistics.median(samples),
+        "p95_ms": percentile(samples, 0.95),
+        "mean_ms": statistics.fmean(samples),
+        "min_ms": min(samples),
+        "samples": len(samples),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Per benchmark: change in median vs baseline and whether it regressed"""
+    comparison = {}
+    for name, stats in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        change = stats["median_ms"] / base["median_ms"] - 1 if base["median_ms"] else 0.0
+        comparison[name] = {
+            "baseline_ms": base["median_ms"],
+            "change": change,
+            "regressed": change > threshold,
+        }
+    return comparison
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the runtime hot paths")
+    parser.add_argument("-k", "--filter", default=None, help="Only benchmarks containing this text")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON-lines history file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline results file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed median slowdown vs baseline (0.10 = 10%%)")
+    parser.add_argument("--json", action="store_true", help="Print the run record as JSON")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, (func, calls) in _benchmarks().items():
+        if args.filter and args.filter not in name:
+            continue
+        results[name] = run_benchmark(func, calls, args.warmup, args.repeat)
+        if not args.json:
+            stats = results[name]
+            print(f"{name:<28} median {stats['median_ms']:9.3f} ms   p95 {stats['p95_ms']:9.3f} ms")
+
+    record = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "warmup": args.warmup,
+        "repeat": args.repeat,
+        "results": results,
+    }
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        record["baseline_commit"] = baseline.get("commit")
+        record["comparison"] = compare(results, baseline, args.threshold)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+    with open(args.history, "a") as f:
+        f.write(json.dumps(record) + "\n")
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(record, f, indent=2)
+
+    regressions = [name for name, c in record.get("comparison", {}).items() if c["regressed"]]
+    if args.json:
+        print(json.dumps(record, indent=2))
+    elif baseline is not None:
+        print(f"\nvs baseline {baseline.get('commit') or ''} (threshold {args.threshold:.0%}):")
+        for name, c in record["comparison"].items():
+            flag = "  REGRESSION" if c["regressed"] else ""
+            print(f"  {name:<28} {c['change']:+7.1%}{flag}")
+    elif args.save_baseline:
+        print(f"\nBaseline saved to {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""
+Output capture regressions: coalesced output must reach the callback, in
+order, before execute_code returns
+"""
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "app", "src", "main", "python"))
+
+import pygenius_runtime  # noqa: E402
+
+
+def _slow_callback(events, delay=0.2):
+    def callback(text, line_type):
+        # Slow only for the chunk the deadline flusher delivers, so
+        # execute_code finishes while that callback is still running
+        if "b" in text and line_type == "output":
+            time.sleep(delay)
+        events.append((line_type, text))
+    return callback
+
+
+def test_finish_waits_for_deadline_flush():
+    events = []
+    code = "import time\nprint('a')\nprint('b')\ntime.sleep(0.12)\nx = 1\n"
+    pygenius_runtime.execute_code(code, _slow_callback(events))
+    events.append(("returned", None))
+    
+    kinds = [line_type for line_type, _ in events]
+    output = "".join(text for line_type, text in events if line_type == "output")
+    assert output == "a\nb\n"
+    assert kinds.index("variables") > max(i for i, k in enumerate(kinds) if k == "output")
+    assert kinds[-1] == "returned"
+
+
+def test_stderr_waits_for_stdout_deadline_flush():
+    events = []
+    code = ("import sys, time\nprint('a')\nprint('b')\ntime.sleep(0.12)\n"
+            "sys.stderr.write('err\\n')\n")
+    pygenius_runtime.execute_code(code, _slow_callback(events))
+    
+    texts = "".join(text for line_type, text in events if line_type == "output")
+    assert texts == "a\nb\nerr\n"